@@ -0,0 +1,159 @@
+import queue
+import threading
+from collections import namedtuple
+
+ACTION_QUEUE_SIZE = 32  # Alerts waiting to run before new ones are dropped
+
+# condition(reading) -> True/False, or None when the reading can't tell (e.g. a
+# missing field), which leaves the rule as it is. The rule becomes active once
+# the condition has held for `on_for` seconds and clears once `clear` (default:
+# not condition) has held for `off_for` seconds; `action(reading)` runs on the
+# activating edge, at most every `cooldown` seconds, and again every `repeat`
+# seconds while it stays active. `on_clear(reading)` runs when it clears.
+# An `isolated` rule's actions get their own dispatcher thread, so a slow action
+# of another rule (or a full shared queue) can't hold them up.
+Rule = namedtuple("Rule", ["name", "condition", "action", "clear", "on_for", "off_for", "cooldown", "repeat",
+                           "on_clear", "isolated"],
+                  defaults=[None, 0.0, 0.0, 0.0, None, None, False])
+
+
+def _field(field, test):
+    def condition(reading):
+        value = getattr(reading, field)
+        return None if value is None else test(value)
+    return condition
+
+
+def equals(field, expected):
+    return _field(field, lambda value: value == expected)
+
+
+def above(field, threshold):
+    return _field(field, lambda value: value > threshold)
+
+
+def below(field, threshold):
+    return _field(field, lambda value: value < threshold)
+
+
+def outside(field, low, high):
+    return _field(field, lambda value: value < low or value > high)
+
+
+def within(field, low, high):
+    return _field(field, lambda value: low <= value <= high)
+
+
+class _RuleState:
+    __slots__ = ("active", "since", "last_fired")
+
+    def __init__(self):
+        self.active = False
+        self.since = None  # When the pending transition's condition started holding
+        self.last_fired = None
+
+
+class ActionDispatcher:
+    """Runs alert actions on a background thread so evaluating rules never blocks."""
+
+    def __init__(self, queue_size=ACTION_QUEUE_SIZE):
+        self.dispatched = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def dispatch(self, name, action, reading):
+        try:
+            self._queue.put_nowait((name, action, reading))
+            self.dispatched += 1
+        except queue.Full:
+            self.dropped += 1
+            print(f"[ERROR] Alert queue full; dropped {name}")
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            name, action, reading = item
+            try:
+                action(reading)
+            except Exception as e:
+                print(f"[ERROR] Alert action {name} failed: {e}")
+
+    def stop(self, timeout=5.0):
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+class RuleEngine:
+    """Evaluates streaming sensor readings against rules; one alert per real condition.
+
+    evaluate() only updates per-rule state and hands actions to the
+    dispatcher, so it is safe to call on the serial reader thread. Times come
+    from the readings' timestamps, so replays behave like live data.
+    """
+
+    def __init__(self, rules, dispatcher=None):
+        self.rules = list(rules)
+        self.dispatcher = dispatcher or ActionDispatcher()
+        self.dispatchers = {rule.name: ActionDispatcher() for rule in self.rules if rule.isolated}
+        self._states = {rule.name: _RuleState() for rule in self.rules}
+
+    def _dispatcher(self, rule):
+        return self.dispatchers.get(rule.name, self.dispatcher)
+
+    def is_active(self, name):
+        return self._states[name].active
+
+    def evaluate(self, reading):
+        """Update every rule with `reading`; returns the names of rules whose action fired."""
+        fired = []
+        now = reading.timestamp
+        for rule in self.rules:
+            state = self._states[rule.name]
+            if state.active:
+                cleared = rule.clear(reading) if rule.clear else _negate(rule.condition(reading))
+                if cleared is None:
+                    continue
+                if not cleared:
+                    state.since = None
+                    if rule.repeat and (state.last_fired is None or now - state.last_fired >= rule.repeat):
+                        self._fire(rule, state, reading, fired)
+                    continue
+                state.since = now if state.since is None else state.since
+                if now - state.since >= rule.off_for:
+                    state.active, state.since = False, None
+                    if rule.on_clear:
+                        self._dispatcher(rule).dispatch(rule.name, rule.on_clear, reading)
+            else:
+                holds = rule.condition(reading)
+                if holds is None:
+                    continue
+                if not holds:
+                    state.since = None
+                    continue
+                state.since = now if state.since is None else state.since
+                if now - state.since >= rule.on_for:
+                    state.active, state.since = True, None
+                    if state.last_fired is None or now - state.last_fired >= rule.cooldown:
+                        self._fire(rule, state, reading, fired)
+        return fired
+
+    def _fire(self, rule, state, reading, fired):
+        state.last_fired = reading.timestamp
+        self._dispatcher(rule).dispatch(rule.name, rule.action, reading)
+        fired.append(rule.name)
+
+    def stop(self):
+        self.dispatcher.stop()
+        for dispatcher in self.dispatchers.values():
+            dispatcher.stop()
+
+
+def _negate(value):
+    return None if value is None else not value
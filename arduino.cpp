@@ -1,5 +1,8 @@
 #include <Wire.h>
 
+// 1 = compact binary frames (set DRISHTI_SERIAL_PROTOCOL=binary on the Python side), 0 = text lines
+#define BINARY_FRAMES 0
+
 const int buttonPin = 2;
 const int MPU6050_ADDR = 0x68;
 
@@ -16,6 +19,20 @@ int pressCount = 0;
 const unsigned long doublePressInterval = 500;
 bool dataSendingEnabled = true;
 
+#if BINARY_FRAMES
+const unsigned long sampleInterval = 100;  // 10 frames per second; a frame is 10 bytes (~10 ms at 9600 baud)
+#else
+const unsigned long sampleInterval = 3000;
+#endif
+
+// Binary frame, little-endian: sync, seq, roll (0.01 deg), temperature (0.01 C),
+// distance (cm), flags, CRC-8 (poly 0x07) of seq..flags
+const uint8_t FRAME_SYNC = 0xA5;
+const uint8_t FLAG_BAD_POSTURE = 0x01;
+const uint8_t FLAG_BUTTON = 0x02;
+const uint8_t FLAG_BUTTON_ONLY = 0x04;
+uint8_t frameSeq = 0;
+
 void setup() {
   Serial.begin(9600);
   Wire.begin();
@@ -38,10 +55,40 @@ long measureDistance() {
   delayMicroseconds(10);
   digitalWrite(trigPin, LOW);
 
-  long duration = pulseIn(echoPin, HIGH);
+  long duration = pulseIn(echoPin, HIGH, 30000);  // No echo within ~5 m reads as 0 instead of stalling 1 s
   return duration * 0.034 / 2;
 }
 
+uint8_t crc8(const uint8_t *data, uint8_t length) {
+  uint8_t crc = 0;
+  for (uint8_t i = 0; i < length; i++) {
+    crc ^= data[i];
+    for (uint8_t bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x80) ? (crc << 1) ^ 0x07 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+void sendFrame(float roll, float temperature, long distance, uint8_t flags) {
+  int16_t rollCenti = (int16_t)lround(roll * 100);
+  int16_t tempCenti = (int16_t)lround(temperature * 100);
+  uint16_t distanceCm = (uint16_t)constrain(distance, 0L, 65535L);
+
+  uint8_t frame[10];
+  frame[0] = FRAME_SYNC;
+  frame[1] = frameSeq++;
+  frame[2] = rollCenti & 0xFF;
+  frame[3] = (rollCenti >> 8) & 0xFF;
+  frame[4] = tempCenti & 0xFF;
+  frame[5] = (tempCenti >> 8) & 0xFF;
+  frame[6] = distanceCm & 0xFF;
+  frame[7] = distanceCm >> 8;
+  frame[8] = flags;
+  frame[9] = crc8(frame + 1, 8);
+  Serial.write(frame, sizeof(frame));
+}
+
 void loop() {
   bool currentButtonState = (digitalRead(buttonPin) == LOW);
 
@@ -62,8 +109,10 @@ void loop() {
       if (pressCount == 2) {
         dataSendingEnabled = !dataSendingEnabled;
         pressCount = 0;
+#if !BINARY_FRAMES
         Serial.print("Mode: ");
         Serial.println(dataSendingEnabled ? "Data Enabled" : "Button Only");
+#endif
       }
     }
   }
@@ -94,6 +143,10 @@ void loop() {
     // Measure distance
     long distance = measureDistance();
 
+#if BINARY_FRAMES
+    uint8_t flags = (posture == "Bad" ? FLAG_BAD_POSTURE : 0) | (buttonPressed ? FLAG_BUTTON : 0);
+    sendFrame(roll, temperature, distance, flags);
+#else
     // Output all data
     Serial.print("Roll: ");
     Serial.print(roll);
@@ -106,11 +159,16 @@ void loop() {
     Serial.print(distance);
     Serial.print("cm, Button: ");
     Serial.println(buttonPressed ? "Yes" : "No");
+#endif
   } else {
+#if BINARY_FRAMES
+    sendFrame(0, 0, 0, FLAG_BUTTON_ONLY | (buttonPressed ? FLAG_BUTTON : 0));
+#else
     // Output only button status
     Serial.print("Button Pressed: ");
     Serial.println(buttonPressed ? "Yes" : "No");
+#endif
   }
 
-  delay(3000);
+  delay(sampleInterval);
 }
@@ -3,8 +3,10 @@ from tkinter import messagebox
 import asyncio
 from bleak import BleakScanner, BleakClient
 import speech_recognition as sr
-import pyttsx3
 import threading
+from tts_service import get_speech, INFO
+from wake_word import WakeWordSpotter, SAMPLE_RATE, WAKE_WORD
+from audio_capture import get_capture
 
 class BluetoothApp:
     def __init__(self, root):
@@ -13,7 +15,8 @@ class BluetoothApp:
 
         # Initialize Bluetooth & Speech Services
         self.speech_recognizer = sr.Recognizer()
-        self.speaker = pyttsx3.init()
+        self.capture = get_capture()  # Shared, always-open microphone
+        self.speech = get_speech()
 
         # UI Components
         self.label = tk.Label(root, text="Assistive Wearable App", font=("Arial", 14, "bold"))
@@ -84,38 +87,48 @@ class BluetoothApp:
         self.speech_label.config(text="Listening for wake word...")
 
         def recognize():
+            # On-device spotting; the cloud only hears audio after the wake word
+            spotter = WakeWordSpotter(fallback=self.recognize_wake_word)
+            audio = self.capture.subscribe()
             while True:
-                try:
-                    with sr.Microphone() as source:
-                        audio = self.speech_recognizer.listen(source)
-                        text = self.speech_recognizer.recognize_google(audio).lower()
-                        print(f"Heard: {text}")
-
-                        if "hello" in text:
-                            self.speech_label.config(text="Wake word detected! Listening for command...")
-                            self.speak("Wake word detected. Please say your command.")
-                            self.listen_for_command()
-                            break  # Stop wake-word loop after activation
-                except sr.UnknownValueError:
-                    continue
-                except sr.RequestError:
-                    self.speech_label.config(text="Speech recognition service error.")
+                chunk = audio.read()
+                if chunk is None and not self.capture.running:
+                    self.speech_label.config(text="No microphone available.")
+                    return
+                if chunk is not None and spotter.feed(chunk):
                     break
 
+            self.speech_label.config(text="Wake word detected! Listening for command...")
+            self.speak("Wake word detected. Please say your command.")
+            self.listen_for_command()
+
         threading.Thread(target=recognize, daemon=True).start()
 
+    def recognize_wake_word(self, samples):
+        """Cloud check of one short utterance, used only until wake word templates are enrolled."""
+        try:
+            text = self.speech_recognizer.recognize_google(sr.AudioData(samples.tobytes(), SAMPLE_RATE, 2)).lower()
+        except sr.UnknownValueError:
+            return False
+        except sr.RequestError:
+            self.speech_label.config(text="Speech recognition service error.")
+            return False
+        print(f"Heard: {text}")
+        return WAKE_WORD in text
+
     # ✅ Listen for Commands After Wake Word
     def listen_for_command(self):
         def recognize():
             try:
-                with sr.Microphone() as source:
-                    self.speech_label.config(text="Listening for command...")
-                    audio = self.speech_recognizer.listen(source)
-                    command = self.speech_recognizer.recognize_google(audio)
-                    self.speech_label.config(text=f"Command: {command}")
-                    print(f"Command recognized: {command}")
+                self.speech_label.config(text="Listening for command...")
+                audio = self.capture.listen()
+                if audio is None:
+                    raise sr.UnknownValueError()
+                command = self.speech_recognizer.recognize_google(audio)
+                self.speech_label.config(text=f"Command: {command}")
+                print(f"Command recognized: {command}")
 
-                    self.speak(f"You said: {command}")
+                self.speak(f"You said: {command}")
 
             except sr.UnknownValueError:
                 self.speech_label.config(text="Could not understand. Try again.")
@@ -126,8 +139,7 @@ class BluetoothApp:
 
     # ✅ Text-to-Speech Function
     def speak(self, text):
-        self.speaker.say(text)
-        self.speaker.runAndWait()
+        self.speech.say(text, INFO, wait=True)
 
 # Run the Tkinter Application
 if __name__ == "__main__":
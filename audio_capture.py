@@ -0,0 +1,159 @@
+import threading
+import numpy as np
+import speech_recognition as sr
+from wake_word import EnergyVAD, SAMPLE_RATE, CHUNK_SAMPLES
+
+BUFFER_SECONDS = 10  # Recent audio kept for pre-roll and slow subscribers
+PRE_ROLL = 0.3  # Seconds of audio kept before detected speech, so first syllables aren't cut
+COMMAND_HANGOVER_CHUNKS = 40  # 0.8 s of quiet ends a command (longer than between words)
+COMMAND_MIN_CHUNKS = 5
+LISTEN_TIMEOUT = 5.0  # Seconds listen() waits for speech to start
+PHRASE_LIMIT = 10.0  # Seconds after which a command is cut off
+
+
+class AudioSubscription:
+    """A consumer's cursor into the capture ring buffer; read() returns consecutive chunks."""
+
+    def __init__(self, capture, position):
+        self.capture = capture
+        self.position = position  # Next sample to read
+        self.dropped = 0  # Samples overwritten before this consumer read them
+
+    def read(self, timeout=1.0):
+        """The next chunk of int16 samples, or None after `timeout` seconds without audio."""
+        chunk, self.position, skipped = self.capture.read_from(self.position, timeout)
+        self.dropped += skipped
+        return chunk
+
+
+class AudioCapture:
+    """One long-lived microphone stream shared by every listener.
+
+    A capture thread keeps the last BUFFER_SECONDS of audio in a ring buffer
+    and a continuously updated noise floor, so listeners never reopen the
+    device or re-run ambient noise calibration, and can start from audio
+    recorded before they asked for it.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, chunk=CHUNK_SAMPLES, buffer_seconds=BUFFER_SECONDS,
+                 device_index=None):
+        self.sample_rate = sample_rate
+        self.chunk = chunk
+        self.device_index = device_index
+        size = int(buffer_seconds * sample_rate) // chunk * chunk
+        self._ring = np.zeros(size, dtype=np.int16)
+        self.position = 0  # Total samples captured so far
+        self.gate = EnergyVAD()  # Only its noise floor is used here
+        self._cond = threading.Condition()
+        self.running = False
+        self._thread = None
+
+    @property
+    def noise_floor(self):
+        return self.gate.noise_floor
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def _capture_loop(self):
+        try:
+            with sr.Microphone(device_index=self.device_index, sample_rate=self.sample_rate,
+                               chunk_size=self.chunk) as source:
+                while self.running:
+                    samples = np.frombuffer(source.stream.read(self.chunk), dtype=np.int16)
+                    self.gate.is_speech(samples)  # Updates the noise floor on quiet chunks
+                    start = self.position % len(self._ring)
+                    with self._cond:
+                        self._ring[start:start + len(samples)] = samples
+                        self.position += len(samples)
+                        self._cond.notify_all()
+        except (OSError, AttributeError) as e:
+            print(f"[ERROR] Microphone capture stopped: {e}")
+        self.running = False
+        with self._cond:
+            self._cond.notify_all()
+
+    def _copy(self, start, end):
+        """Samples [start, end) out of the ring; the caller ensures they are still in it."""
+        size = len(self._ring)
+        first, last = start % size, end % size
+        if first < last or start == end:
+            return self._ring[first:last].copy()
+        return np.concatenate((self._ring[first:], self._ring[:last]))
+
+    def read_from(self, position, timeout=1.0):
+        """(chunk, next position, samples skipped) for the audio after `position`."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.position > position or not self.running, timeout)
+            oldest = max(self.position - len(self._ring), 0)
+            skipped = max(oldest - position, 0)
+            position = max(position, oldest)
+            if self.position <= position:
+                return None, position, skipped
+            end = min(position + self.chunk, self.position)
+            return self._copy(position, end), end, skipped
+
+    def subscribe(self, pre_roll=0.0):
+        """A subscription starting `pre_roll` seconds before now."""
+        with self._cond:
+            return AudioSubscription(self, max(self.position - int(pre_roll * self.sample_rate), 0))
+
+    def listen(self, start=None, timeout=LISTEN_TIMEOUT, phrase_limit=PHRASE_LIMIT, pre_roll=PRE_ROLL):
+        """The next utterance at or after sample `start` (default: now) as sr.AudioData, or None.
+
+        Speech that began while the caller was busy (e.g. right after the
+        wake word) is still in the ring buffer, so it isn't cut off.
+        """
+        subscription = AudioSubscription(self, self.position if start is None else start)
+        vad = EnergyVAD(hangover=COMMAND_HANGOVER_CHUNKS, min_chunks=COMMAND_MIN_CHUNKS, noise_floor=self.noise_floor)
+        waited = 0.0
+        limit = int(phrase_limit * self.sample_rate)
+        speech_start = None
+        while self.running or self.position > subscription.position:
+            chunk_start = subscription.position
+            chunk = subscription.read()
+            if chunk is None:
+                if not self.running:
+                    return None
+                continue
+            utterance = vad.feed(chunk)
+            if vad.in_speech and speech_start is None:
+                speech_start = chunk_start
+            if utterance is None and speech_start is not None and subscription.position - speech_start > limit:
+                utterance = vad.flush()  # Cut off over-long phrases
+            if utterance is not None:
+                pre = self._pre_roll(speech_start, pre_roll)
+                return sr.AudioData(np.concatenate((pre, utterance)).tobytes(), self.sample_rate, 2)
+            if not vad.in_speech:
+                speech_start = None
+                waited += len(chunk) / self.sample_rate
+                if timeout is not None and waited >= timeout:
+                    return None
+        return None
+
+    def _pre_roll(self, speech_start, seconds):
+        with self._cond:
+            oldest = max(self.position - len(self._ring), 0)
+            return self._copy(max(speech_start - int(seconds * self.sample_rate), oldest), max(speech_start, oldest))
+
+    def stop(self):
+        self.running = False
+        if self._thread:
+            self._thread.join(timeout=2)
+
+
+_capture = None
+_capture_lock = threading.Lock()
+
+
+def get_capture():
+    """The process-wide AudioCapture, started on first use."""
+    global _capture
+    with _capture_lock:
+        if _capture is None or not _capture.running:
+            _capture = AudioCapture().start()
+        return _capture
@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from bench_utils import git_commit, summarize
+from alert_rules import Rule, RuleEngine, equals
+from sensor_history import SensorHistory
+from sensor_log import SensorLog, SqliteSink
+from sensor_state import SensorState
+from serial_reader import SerialReader, BAUD_RATE
+from virtual_arduino import VirtualArduino
+
+DRAIN_SECONDS = 1.0  # Time after the device stops for in-flight samples to arrive
+
+
+class _Unwrap:
+    """Sample index from the virtual device's distance counter, which wraps at 60000."""
+
+    def __init__(self):
+        self.last = 0
+
+    def __call__(self, distance):
+        index = self.last - self.last % 60000 + int(distance)
+        if index < self.last - 30000:
+            index += 60000
+        self.last = index
+        return index
+
+
+def run_once(protocol, rate, baud, seconds):
+    """Stream synthetic samples through the full ingestion path; returns one result dict.
+
+    Latency runs from the virtual device writing a sample's bytes to: the
+    reader publishing it (reading), the throttled UI update carrying it (ui,
+    before Tk's after() hop) and the alert action running for a button press.
+    """
+    device = VirtualArduino(protocol=protocol, rate=rate, baud=baud, record=True)
+    received, ui_updates, alerts = [], [], []
+    unwrap = _Unwrap()
+
+    def on_alert(reading):
+        alerts.append((time.perf_counter(), reading.distance))
+
+    state = SensorState()
+    history = SensorHistory(spill=False)
+    with tempfile.TemporaryDirectory() as directory:
+        log = SensorLog(SqliteSink(os.path.join(directory, "bench.db")))
+        rules = RuleEngine([Rule("sos", equals("button", True), on_alert)])
+
+        def on_reading(reading):
+            # What HardwareMonitor and SensorDataApp do on the reader thread
+            log.write(reading)
+            history.add(reading)
+            rules.evaluate(reading)
+            if reading.distance is not None:  # Button-only lines (replays) carry no sample index
+                received.append((time.perf_counter(), unwrap(reading.distance)))
+
+        def on_update(reading):
+            ui_updates.append((time.perf_counter(), reading.distance))
+
+        reader = SerialReader(device.port, baud, state=state, on_reading=on_reading, on_update=on_update,
+                              protocol=protocol, reset_delay=0)
+        reader.start()
+        time.sleep(0.1)  # Let the reader open the port before data flows
+        cpu_start = time.process_time()
+        device.start()
+        time.sleep(seconds)
+        device.stop()
+        time.sleep(DRAIN_SECONDS)
+        cpu_seconds = time.process_time() - cpu_start
+        reader.stop()
+        rules.stop()
+        log.stop()
+
+    sent = device.sent
+    reading_latency = [at - sent[index] for at, index in received if index < len(sent)]
+    # UI and alert events carry the wrapped counter; match them to the latest sample with that counter
+    by_counter = {}
+    for _, index in received:
+        by_counter[index % 60000] = index
+    ui_latency = [at - sent[by_counter[int(distance)]] for at, distance in ui_updates
+                  if by_counter.get(int(distance), len(sent)) < len(sent)]
+    alert_latency = [at - sent[by_counter[int(distance)]] for at, distance in alerts
+                     if by_counter.get(int(distance), len(sent)) < len(sent)]
+
+    result = {
+        "protocol": protocol,
+        "rate": rate,
+        "baud": baud,
+        "seconds": seconds,
+        "sent": device.count,
+        "received": len(received),
+        "lost": device.count - len(received),
+        "decode_errors": reader.errors,
+        "bytes": device.bytes,
+        "sustained_rate": len(received) / seconds,
+        "cpu_percent": 100 * cpu_seconds / (seconds + DRAIN_SECONDS),
+        "log_dropped": log.dropped,
+        "stages": {},
+    }
+    for name, samples in (("reading", reading_latency), ("ui", ui_latency), ("alert", alert_latency)):
+        if samples:
+            result["stages"][name] = summarize(samples)
+    return result
+
+
+def parse_rate(text):
+    return None if text == "max" else float(text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serial ingestion latency and throughput against a virtual Arduino.")
+    parser.add_argument("--protocol", default="both", choices=["text", "binary", "both"])
+    parser.add_argument("--rates", default="0.33,10,max", help="Samples per second; 'max' = as fast as the link allows")
+    parser.add_argument("--baud", type=int, default=BAUD_RATE, help="Emulated line speed; 0 = unpaced (parser ceiling)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Streaming time per run")
+    parser.add_argument("--output", default=None, help="JSON result path (default bench_results/<commit>-serial.json)")
+    args = parser.parse_args()
+
+    protocols = ["text", "binary"] if args.protocol == "both" else [args.protocol]
+    runs = []
+    for protocol in protocols:
+        for rate in args.rates.split(","):
+            run = run_once(protocol, parse_rate(rate), args.baud, args.seconds)
+            runs.append(run)
+            print(f"{protocol:<6} rate={rate:<5} sent={run['sent']} received={run['received']} "
+                  f"sustained={run['sustained_rate']:.1f}/s errors={run['decode_errors']} "
+                  f"CPU {run['cpu_percent']:.1f}%")
+            for stage, stats in run["stages"].items():
+                print(f"  {stage:<8} " + "  ".join(f"{key}={value:.2f}" for key, value in stats.items()))
+
+    result = {"commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "runs": runs}
+    output = args.output or os.path.join("bench_results", f"{result['commit'] or 'local'}-serial.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Wrote {output}")
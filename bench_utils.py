@@ -0,0 +1,41 @@
+import subprocess
+import sys
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+def peak_rss_mb(children=False):
+    """Peak resident set size in MB of this process or, with `children`, of its largest finished child.
+
+    The two are separate high-water marks, so they are reported side by side,
+    never added. Children only count once they have exited and been joined
+    (e.g. stopped inference workers); None where that isn't available.
+    """
+    try:
+        import resource
+
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+        return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024  # bytes on macOS, KB elsewhere
+    except ImportError:
+        if children:
+            return None
+        import psutil  # Windows has no resource module
+
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(samples):
+    """Latency percentiles in milliseconds for a list of seconds."""
+    milliseconds = np.asarray(samples) * 1000
+    summary = {f"p{p}_ms": float(np.percentile(milliseconds, p)) for p in PERCENTILES}
+    summary["mean_ms"] = float(milliseconds.mean())
+    return summary
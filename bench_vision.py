@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import time
+from bench_utils import git_commit, peak_rss_mb, summarize
+from frame_hub import FrameHub, open_source
+from inference_backend import DETECTOR_BACKEND, ONNX_THREADS
+from object_distance_detector import ObjectDistanceDetector
+
+
+def run_benchmark(source_spec, backend=DETECTOR_BACKEND, threads=ONNX_THREADS, workers=0, repeat=1, limit=None):
+    """Replay a source through ObjectDistanceDetector's analysis pipeline; returns the result dict."""
+    source = open_source(source_spec, loop=False)
+    detector = ObjectDistanceDetector(frame_hub=FrameHub(source), backend=backend, threads=threads,
+                                      workers=workers, headless=True)
+    if not detector.load_models():
+        raise SystemExit(1)
+
+    # Decode once up front, timing it as its own stage
+    frames, decode_times = [], []
+    while limit is None or len(frames) < limit:
+        start = time.perf_counter()
+        frame = source.read()
+        if frame is None:
+            if source.exhausted:
+                break
+            continue
+        decode_times.append(time.perf_counter() - start)
+        frames.append(frame)
+    source.release()
+    if not frames:
+        raise SystemExit(f"No frames could be read from {source_spec}")
+
+    detector.process_frame(frames[0])  # Warm-up outside the measurement
+
+    stage_samples = {"decode": decode_times}
+    totals = []
+    bench_start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            start = time.perf_counter()
+            if detector.process_frame(frame) is None:
+                continue
+            totals.append(time.perf_counter() - start)
+            for stage, seconds in detector.stage_times.items():
+                stage_samples.setdefault(stage, []).append(seconds)
+    elapsed = time.perf_counter() - bench_start
+
+    if detector.worker_pool:
+        detector.worker_pool.stop()
+
+    stage_samples["total"] = totals
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source": str(source_spec),
+        "backend": backend,
+        "threads": threads,
+        "workers": workers,
+        "frames": len(totals),
+        "throughput_fps": len(totals) / elapsed if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_worker_rss_mb": peak_rss_mb(children=True) if workers else None,  # Largest worker, stopped above
+        "dropped": dict(detector.analysis.dropped),  # Frames dropped, by stage
+        "stages": {stage: summarize(samples) for stage, samples in stage_samples.items() if samples},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay frames through the vision pipeline and time each stage.")
+    parser.add_argument("--source", default="saved_frames", help="Image directory, image or video file")
+    parser.add_argument("--backend", default=DETECTOR_BACKEND, help="torch, onnx or onnx-int8")
+    parser.add_argument("--threads", type=int, default=ONNX_THREADS)
+    parser.add_argument("--workers", type=int, default=0, help="Detector worker processes (0 = in-process)")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the source")
+    parser.add_argument("--limit", type=int, default=None, help="Use at most this many frames")
+    parser.add_argument("--output", default=None, help="JSON result path (default bench_results/<commit>-<backend>.json)")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.source, args.backend, args.threads, args.workers, args.repeat, args.limit)
+
+    print(f"{result['frames']} frames, {result['throughput_fps']:.2f} FPS, peak RSS {result['peak_rss_mb']:.0f} MB"
+          + (f" (largest worker {result['peak_worker_rss_mb']:.0f} MB)" if result["peak_worker_rss_mb"] else ""))
+    for stage, stats in result["stages"].items():
+        print(f"  {stage:<9} " + "  ".join(f"{key}={value:.2f}" for key, value in stats.items()))
+
+    output = args.output or os.path.join("bench_results", f"{result['commit'] or 'local'}-{args.backend}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Wrote {output}")
@@ -0,0 +1,93 @@
+import argparse
+import glob
+import json
+import os
+import time
+from bench_utils import git_commit, summarize
+from wake_word import (WakeWordSpotter, EnergyVAD, read_wav, CHUNK_SAMPLES, MAX_WAKE_CHUNKS, TEMPLATE_DIR,
+                       WAKE_THRESHOLD, WAKE_WORD)
+
+
+def run_benchmark(fixture_dir, template_dir=TEMPLATE_DIR, threshold=WAKE_THRESHOLD):
+    """Stream each fixture WAV through the spotter in real-time-sized chunks; returns the result dict.
+
+    Fixtures whose file name starts with the wake word are expected to trigger, all others not.
+    """
+    paths = sorted(glob.glob(os.path.join(fixture_dir, "*.wav")))
+    if not paths:
+        raise SystemExit(f"No WAV fixtures in {fixture_dir}")
+
+    chunk_times, decision_times, detection_delays = [], [], []
+    counts = {"true_positive": 0, "false_positive": 0, "missed": 0, "true_negative": 0}
+    audio_seconds = cpu_seconds = 0.0
+    spotter = WakeWordSpotter(template_dir, threshold)
+    if not spotter.templates:
+        raise SystemExit(f"No wake word templates in {template_dir}; run `python wake_word.py enroll`")
+    for path in paths:
+        samples, spotter.sample_rate = read_wav(path)
+        sample_rate = spotter.sample_rate
+        spotter.vad = EnergyVAD(max_chunks=MAX_WAKE_CHUNKS)  # Fresh noise floor per recording
+
+        expected = os.path.basename(path).lower().startswith(WAKE_WORD)
+        detected = False
+        cpu_start = time.process_time()
+        for start in range(0, len(samples), CHUNK_SAMPLES):
+            chunk = samples[start:start + CHUNK_SAMPLES]
+            candidates = spotter.candidates
+            began = time.perf_counter()
+            fired = spotter.feed(chunk)
+            elapsed = time.perf_counter() - began
+            chunk_times.append(elapsed)
+            if spotter.candidates > candidates:
+                decision_times.append(elapsed)  # Chunks that ran MFCC + DTW
+            if fired and not detected:
+                detected = True
+                # End of the word to detection: the VAD's trailing silence plus the decision itself
+                detection_delays.append(spotter.vad.hangover * CHUNK_SAMPLES / sample_rate + elapsed)
+        cpu_seconds += time.process_time() - cpu_start
+        audio_seconds += len(samples) / sample_rate
+
+        if expected:
+            counts["true_positive" if detected else "missed"] += 1
+        else:
+            counts["false_positive" if detected else "true_negative"] += 1
+
+    stages = {"chunk": summarize(chunk_times)}
+    if decision_times:
+        stages["decision"] = summarize(decision_times)
+    if detection_delays:
+        stages["detection_latency"] = summarize(detection_delays)
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "fixtures": len(paths),
+        "threshold": threshold,
+        "audio_seconds": audio_seconds,
+        "cpu_seconds": cpu_seconds,
+        "cpu_percent": 100 * cpu_seconds / audio_seconds if audio_seconds else 0.0,  # Of one core, in real time
+        "counts": counts,
+        "stages": stages,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Wake word detection latency, CPU use and accuracy on WAV fixtures.")
+    parser.add_argument("--fixtures", default="wake_word_fixtures",
+                        help=f"WAVs; names starting with '{WAKE_WORD}' should trigger")
+    parser.add_argument("--templates", default=TEMPLATE_DIR)
+    parser.add_argument("--threshold", type=float, default=WAKE_THRESHOLD)
+    parser.add_argument("--output", default=None, help="JSON result path (default bench_results/<commit>-wake.json)")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.fixtures, args.templates, args.threshold)
+
+    print(f"{result['fixtures']} fixtures, {result['audio_seconds']:.1f} s of audio, "
+          f"CPU {result['cpu_percent']:.1f}% of one core, {result['counts']}")
+    for stage, stats in result["stages"].items():
+        print(f"  {stage:<16} " + "  ".join(f"{key}={value:.2f}" for key, value in stats.items()))
+
+    output = args.output or os.path.join("bench_results", f"{result['commit'] or 'local'}-wake.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Wrote {output}")
@@ -0,0 +1,106 @@
+import re
+from collections import namedtuple
+
+MAX_EDITS = 2  # Typos/mishearings tolerated in phrases of at least LONG_PHRASE characters
+LONG_PHRASE = 9  # Shorter phrases tolerate one edit; two would let "picture" match "posture"
+
+Route = namedtuple("Route", ["intent", "phrase", "edits"])
+
+
+def normalize(text):
+    """Lowercase words only: "What's my Body-Temperature?" -> "whats my body temperature"."""
+    return " ".join(re.sub(r"[^a-z0-9 ]+", " ", text.lower().replace("'", "")).split())
+
+
+def max_edits(phrase):
+    return MAX_EDITS if len(phrase) >= LONG_PHRASE else 1
+
+
+def deletions(word, edits):
+    """`word` and every string made by deleting up to `edits` characters from it."""
+    found = {word}
+    frontier = {word}
+    for _ in range(edits):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 once it is certain to exceed `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class CommandRouter:
+    """Maps recognized speech to intent handlers through a precompiled fuzzy phrase index.
+
+    Every phrase is indexed under all its deletion variants (symmetric
+    delete), so matching an utterance costs a fixed number of dict lookups
+    per word window, however many commands are registered.
+
+    Handlers are called as handler(command) and return the text to say.
+    Register every intent before match() can run on another thread; the
+    index isn't locked.
+
+    >>> router = CommandRouter()
+    >>> router.add("posture", ["posture", "how am i sitting"], None)
+    >>> router.add("distance", ["distance", "how far"], None)
+    >>> router.add("temperature", ["body temperature"], None)
+    >>> router.match("whats my postur").intent, router.match("how far is it").intent
+    ('posture', 'distance')
+    >>> router.match("my bdy temprature").intent  # Two edits in a long phrase
+    'temperature'
+    >>> router.match("take a picture") is None, router.match("how are you") is None
+    (True, True)
+    """
+
+    def __init__(self, fallback="Sorry, I didn't understand that."):
+        self.fallback = fallback
+        self._handlers = {}
+        self._index = {}  # deletion variant -> {(phrase, intent)}
+        self._max_words = 1
+
+    def add(self, intent, phrases, handler):
+        """Register `handler` for an intent recognized by any of `phrases`."""
+        self._handlers[intent] = handler
+        for phrase in phrases:
+            phrase = normalize(phrase)
+            self._max_words = max(self._max_words, len(phrase.split()))
+            for variant in deletions(phrase, max_edits(phrase)):
+                self._index.setdefault(variant, set()).add((phrase, intent))
+
+    def match(self, command):
+        """Best Route for `command` (fewest edits, then longest phrase), or None."""
+        words = normalize(command).split()
+        best, best_key = None, None
+        for size in range(min(self._max_words, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                window = " ".join(words[start:start + size])
+                candidates = set()
+                for variant in deletions(window, max_edits(window)):
+                    candidates |= self._index.get(variant, set())
+                for phrase, intent in candidates:
+                    edits = edit_distance(window, phrase, max_edits(phrase))
+                    if edits > max_edits(phrase):
+                        continue
+                    key = (edits, -len(phrase), phrase)
+                    if best is None or key < best_key:
+                        best, best_key = Route(intent, phrase, edits), key
+        return best
+
+    def route(self, command):
+        """Answer `command` with its intent's handler, or the fallback text."""
+        route = self.match(command)
+        if route is None:
+            return self.fallback
+        return self._handlers[route.intent](command)
@@ -0,0 +1,65 @@
+import time
+import cv2
+import numpy as np
+
+# Defaults for the scene-change gate
+MIN_DETECTION_INTERVAL = 0.5  # Never run inference more often than this (seconds)
+MAX_DETECTION_INTERVAL = 8.0  # Always run inference at least this often (seconds)
+CHANGE_THRESHOLD = 10.0  # Mean grey-level difference (0-255) that counts as a new scene
+THUMBNAIL_SIZE = (32, 24)  # Downscaled (width, height) the change score is computed on
+
+
+class SceneChangeScheduler:
+    """Gate inference on a cheap frame-difference score of a tiny grayscale thumbnail."""
+
+    def __init__(self, min_interval=MIN_DETECTION_INTERVAL, max_interval=MAX_DETECTION_INTERVAL,
+                 threshold=CHANGE_THRESHOLD, thumbnail_size=THUMBNAIL_SIZE):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.threshold = threshold
+        self.thumbnail_size = thumbnail_size
+
+        width, height = thumbnail_size
+        self._small = np.empty((height, width, 3), np.uint8)
+        self._thumb = np.empty((height, width), np.uint8)
+        self._reference = np.empty((height, width), np.uint8)  # Thumbnail at the last inference
+        self._has_reference = False
+
+        self.last_run = None
+        self.last_score = 0.0
+        self.runs = 0
+        self.skipped = 0
+
+    def change_score(self, frame):
+        """Mean absolute difference between this frame and the last inferred one."""
+        cv2.resize(frame, self.thumbnail_size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._thumb)
+        if not self._has_reference:
+            return float("inf")
+        return cv2.norm(self._thumb, self._reference, cv2.NORM_L1) / self._thumb.size
+
+    def should_run(self, frame, now=None):
+        """Return True if inference should run on this frame, and record it if so."""
+        now = time.monotonic() if now is None else now
+        elapsed = float("inf") if self.last_run is None else now - self.last_run
+
+        # Inside the minimum interval the frame is not even scored.
+        if elapsed < self.min_interval:
+            self.skipped += 1
+            return False
+
+        self.last_score = self.change_score(frame)
+        if elapsed < self.max_interval and self.last_score < self.threshold:
+            self.skipped += 1
+            return False
+
+        np.copyto(self._reference, self._thumb)
+        self._has_reference = True
+        self.last_run = now
+        self.runs += 1
+        return True
+
+    def reset(self):
+        """Force inference on the next frame that arrives."""
+        self._has_reference = False
+        self.last_run = None
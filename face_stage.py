@@ -0,0 +1,56 @@
+import cv2
+import numpy as np
+import mediapipe as mp
+
+mp_face_detection = mp.solutions.face_detection
+
+FACE_DETECTION_WIDTH = 320  # Frames and crops wider than this are downscaled before MediaPipe
+HEAD_FRACTION = 0.5  # Top part of a person box that is searched for a face
+
+
+class FaceStage:
+    """MediaPipe face detection on person crops or a downscaled frame, boxes in full-frame pixels."""
+
+    def __init__(self, min_detection_confidence=0.3, detection_width=FACE_DETECTION_WIDTH):
+        self.face_detection = mp_face_detection.FaceDetection(min_detection_confidence=min_detection_confidence)
+        self.detection_width = detection_width
+
+    def _detect(self, rgb, x_offset=0, y_offset=0):
+        """Face boxes in `rgb`, shifted by its offset inside the full frame."""
+        height, width = rgb.shape[:2]
+        if width > self.detection_width:
+            scale = self.detection_width / width
+            rgb = cv2.resize(rgb, (self.detection_width, max(int(height * scale), 1)), interpolation=cv2.INTER_AREA)
+        results = self.face_detection.process(np.ascontiguousarray(rgb))
+
+        boxes = []
+        for detection in results.detections or ():
+            # Relative boxes map straight back to the un-scaled crop size
+            bboxC = detection.location_data.relative_bounding_box
+            x1 = x_offset + int(bboxC.xmin * width)
+            y1 = y_offset + int(bboxC.ymin * height)
+            boxes.append((x1, y1, x1 + int(bboxC.width * width), y1 + int(bboxC.height * height)))
+        return boxes
+
+    def detect(self, rgb_frame, person_boxes=None):
+        """(N, 4) x1, y1, x2, y2 face boxes.
+
+        With `person_boxes` only the head area of each person is searched, and
+        nothing runs at all when no person was detected. Without it the whole
+        frame is searched at reduced resolution.
+        """
+        if person_boxes is None:
+            boxes = self._detect(rgb_frame)
+        else:
+            frame_height, frame_width = rgb_frame.shape[:2]
+            boxes = []
+            for x1, y1, x2, y2 in np.asarray(person_boxes, dtype=np.int32).tolist():
+                x1, y1 = max(x1, 0), max(y1, 0)
+                x2 = min(x2, frame_width)
+                y2 = min(y1 + max(int((y2 - y1) * HEAD_FRACTION), 1), frame_height)
+                if x2 > x1 and y2 > y1:
+                    boxes.extend(self._detect(rgb_frame[y1:y2, x1:x2], x1, y1))
+        return np.array(boxes, dtype=np.int32).reshape(-1, 4)
+
+    def close(self):
+        self.face_detection.close()
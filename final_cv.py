@@ -1,12 +1,11 @@
 # Commented out distance-related processing to prevent it from appearing
-import serial
 import requests
-import openpyxl
 import tkinter as tk
-import pyttsx3
 from sinch import SinchClient
-from serial import SerialException
-from threading import Thread
+from tts_service import get_speech, INFO
+from serial_reader import SerialReader, SERIAL_PORT
+from sensor_log import SensorLog
+from alert_rules import Rule, RuleEngine, equals, outside, within
 
 sinch_client = SinchClient(
     key_id="03bdc51a-7e51-4695-a08e-3770ad2f0c7e",
@@ -14,6 +13,17 @@ sinch_client = SinchClient(
     project_id="f0c6b6bc-428b-4c92-9208-80f18ee7ff4f"
 )
 
+SOS_COOLDOWN = 60  # Seconds between help SMS while the button keeps being pressed
+HTTP_TIMEOUT = 10  # Seconds the location lookup and the SMS request may take before giving up
+POSTURE_HOLD = 5  # Seconds posture must stay bad (or good again) before it changes
+POSTURE_REMINDER = 60  # Seconds between reminders while posture stays bad
+# Bad posture is a roll outside the sketch's -200..-100 band; it only counts as fixed
+# once the roll is back inside a narrower band, so readings near the edge don't flap
+GOOD_ROLL = (-200, -100)
+RECOVERED_ROLL = (-190, -110)
+
+sinch_client.configuration.connection_timeout = HTTP_TIMEOUT
+
 class SensorDataApp:
     def __init__(self, root):
         self.root = root
@@ -21,7 +31,7 @@ class SensorDataApp:
         self.root.geometry("600x400")
         self.root.configure(bg="green")
 
-        self.engine = pyttsx3.init()
+        self.speech = get_speech()
 
         title_label = tk.Label(
             root, text="Sensor Data Monitor", font=("Helvetica", 20, "bold"),
@@ -38,68 +48,55 @@ class SensorDataApp:
         )
         self.data_label.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
 
-        self.wb = openpyxl.Workbook()
-        self.sheet = self.wb.active
-        self.sheet.title = "Sensor Data"
-        self.sheet.append(['Roll', 'Temp', 'Posture', 'Button'])
-
-
-        self.running = True
-        self.serial_thread = Thread(target=self.read_serial_data)
-        self.serial_thread.start()
-
-    def read_serial_data(self):
+        # Batched, append-only log; `python sensor_log.py export` writes the xlsx on demand
+        self.log = SensorLog()
+
+        # One alert per real condition; actions run off the serial thread
+        self.alerts = RuleEngine([
+            # SOS gets its own worker so a reminder being spoken can't delay the SMS
+            Rule("sos", equals("button", True), self.send_sms_alert, cooldown=SOS_COOLDOWN, isolated=True),
+            Rule("bad_posture", outside("roll", *GOOD_ROLL), self.notify_bad_posture,
+                 clear=within("roll", *RECOVERED_ROLL), on_for=POSTURE_HOLD, off_for=POSTURE_HOLD, repeat=POSTURE_REMINDER, on_clear=self.posture_recovered),
+        ])
+
+        self.reader = SerialReader(
+            SERIAL_PORT, on_reading=self.on_reading,
+            on_update=lambda reading: self.root.after(0, self.show_reading, reading),
+            on_status=lambda status: self.root.after(0, self.on_serial_status, status))
+        self.reader.start()
+
+    def on_reading(self, reading):
+        # Serial reader thread: log and evaluate alert rules, nothing that blocks
+        self.log.write(reading)
+        self.alerts.evaluate(reading)
+
+    def show_reading(self, reading):
+        text = f"Roll: {reading.roll}°, Temp: {reading.temperature}°C, Posture: {reading.posture}, " \
+               f"Button: {'Yes' if reading.button else 'No'}"
+        if self.alerts.is_active("bad_posture"):
+            self.data_label.config(text=f"Maintain posture! Data: {text}")
+        else:
+            self.data_label.config(text=f"Received data: {text}")
+
+    def on_serial_status(self, status):
+        if status == "unavailable":
+            print(f"Error: could not open {SERIAL_PORT}")
+            self.data_label.config(text="No Arduino detected")
+        elif status == "lost":
+            self.handle_connection_lost()
+
+    def send_sms_alert(self, reading=None):
         try:
-            arduino = serial.Serial('COM5', 9600)  # Adjust port accordingly
-
-            while self.running:
-                try:
-                    if arduino.in_waiting > 0:
-                        data = arduino.readline().decode('utf-8').strip()
-
-                        # Update the label with received data
-                        self.data_label.config(text=f"Received data: {data}")
-
-                        # Parse the data
-                        data_parts = data.split(", ")
-                        roll = data_parts[0].split(": ")[1] if len(data_parts) > 0 else ''
-                        temp = data_parts[1].split(": ")[1] if len(data_parts) > 1 else ''
-                        posture = data_parts[3].split(": ")[1] if len(data_parts) > 3 else ''
-                        # distance = data_parts[4].split(": ")[1] if len(data_parts) > 4 else ''  # Commented out
-                        button = data_parts[5].split(": ")[1] if len(data_parts) > 5 else ''
-
-                        # Write data to Excel
-                        self.sheet.append([roll, temp, posture, button])
-                        self.wb.save('sensor_data.xlsx')  # Save workbook
-
-                        # Check for button press and send SMS
-                        if button.lower() == "yes":
-                            self.send_sms_alert()
-
-                        # Check posture and change background color
-                        if posture.lower() == "bad":
-                            self.root.configure(bg="red")
-                            self.data_label.config(text=f"Maintain posture! Data: {data}")
-                            self.notify_bad_posture()
-                        else:
-                            self.root.configure(bg="green")
-
-                except SerialException:
-                    self.handle_connection_lost()
-                    break
+            try:
+                response = requests.get('https://ipinfo.io', timeout=HTTP_TIMEOUT)
+                location_data = response.json()
+                latitude = f"Latitude: {location_data['loc'].split(',')[0]}"
+                longitude = f"Longitude: {location_data['loc'].split(',')[1]}"
+                message_body = f"Mahesh needs help. He is at this location: {latitude}, {longitude}"
+            except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+                print(f"[ERROR] Location lookup failed, sending SOS without it: {e}")
+                message_body = "Mahesh needs help. His location is unavailable."
 
-        except Exception as e:
-            print(f"Error: {e}")
-
-    def send_sms_alert(self):
-        try:
-            response = requests.get('https://ipinfo.io')
-            location_data = response.json()
-            latitude = f"Latitude: {location_data['loc'].split(',')[0]}"
-            longitude = f"Longitude: {location_data['loc'].split(',')[1]}"
-            
-            message_body = f"Mahesh needs help. He is at this location: {latitude}, {longitude}"
-            
             send_batch_response = sinch_client.sms.batches.send(
                 body=message_body,
                 to=["+12013284561"],
@@ -111,17 +108,21 @@ class SensorDataApp:
         except Exception as e:
             print(f"Error sending SMS: {e}")
 
-    def notify_bad_posture(self):
-        # Display notification and speak
-        self.engine.say("Maintain posture.")
-        self.engine.runAndWait()
+    def notify_bad_posture(self, reading=None):
+        # Display notification and speak (queued, so the serial loop keeps reading)
+        self.root.after(0, self.root.configure, {"bg": "red"})
+        self.speech.say("Maintain posture.", INFO, key="posture")
+
+    def posture_recovered(self, reading=None):
+        self.root.after(0, self.root.configure, {"bg": "green"})
 
     def handle_connection_lost(self):
         self.data_label.config(text="Connection lost")
 
     def on_close(self):
-        self.running = False
-        self.serial_thread.join()
+        self.reader.stop()
+        self.alerts.stop()
+        self.log.stop()
         self.root.destroy()
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+import cv2
+
+ARCHIVE_ENABLED = os.environ.get("DRISHTI_ARCHIVE", "0") == "1"  # Archive frames at detection events
+# Kept apart from the saved_frames/ fixtures so retention never deletes them
+ARCHIVE_DIR = os.environ.get("DRISHTI_ARCHIVE_DIR", os.path.join("saved_frames", "archive"))
+ARCHIVE_FORMAT = os.environ.get("DRISHTI_ARCHIVE_FORMAT", "jpg")  # "jpg" snapshots or "video" segments
+ARCHIVE_MAX_MB = float(os.environ.get("DRISHTI_ARCHIVE_MAX_MB", "500"))  # Disk budget; oldest files go first
+ARCHIVE_MAX_AGE_HOURS = float(os.environ.get("DRISHTI_ARCHIVE_MAX_AGE_HOURS", "168"))
+ARCHIVE_QUEUE_SIZE = 8  # Frames waiting to be written before new ones are dropped
+ARCHIVE_MIN_INTERVAL = 1.0  # Seconds between archived frames with the same tag
+JPEG_QUALITY = 85
+SEGMENT_SECONDS = 30  # Length of each video segment
+SEGMENT_FPS = 5
+ARCHIVE_PREFIXES = ("frame_", "segment_")
+
+
+class FrameArchiver:
+    """Writes tagged frames to disk on a background thread, within a retention budget.
+
+    submit() never blocks: it copies the frame into a bounded queue, or drops
+    it (counted in `dropped`) when the writer is behind or the same tag was
+    archived less than `min_interval` seconds ago.
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR, fmt=ARCHIVE_FORMAT, max_mb=ARCHIVE_MAX_MB,
+                 max_age_hours=ARCHIVE_MAX_AGE_HOURS, queue_size=ARCHIVE_QUEUE_SIZE,
+                 min_interval=ARCHIVE_MIN_INTERVAL, quality=JPEG_QUALITY, segment_seconds=SEGMENT_SECONDS):
+        if fmt not in ("jpg", "video"):
+            raise ValueError(f"Unknown archive format: {fmt} (expected jpg or video)")
+        self.directory = directory
+        self.fmt = fmt
+        self.max_bytes = max_mb * 1024 * 1024
+        self.max_age = max_age_hours * 3600
+        self.min_interval = min_interval
+        self.quality = quality
+        self.segment_seconds = segment_seconds
+        self.written = 0  # Frames written
+        self.dropped = 0
+        self.deleted = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._last_submit = {}  # tag -> monotonic time of its last accepted frame
+        self._files = deque()  # (path, mtime, size), oldest first
+        self._total_bytes = 0
+        self._segment = None  # (cv2.VideoWriter, path, start time, frame shape)
+        self._scan_existing()
+
+        self.running = True
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def _scan_existing(self):
+        """Pick up archives from earlier runs so they count against the budget."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.startswith(ARCHIVE_PREFIXES):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                entries.append((path, stat.st_mtime, stat.st_size))
+        for entry in sorted(entries, key=lambda entry: entry[1]):
+            self._files.append(entry)
+            self._total_bytes += entry[2]
+
+    def submit(self, frame, tag=None, timestamp=None, copy=True):
+        """Queue `frame` (a copy, unless the caller owns it) for archiving; returns False if it was dropped."""
+        now = time.monotonic()
+        if now - self._last_submit.get(tag, float("-inf")) < self.min_interval:
+            return False
+        if self._queue.full():
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait((frame.copy() if copy else frame, tag, timestamp or time.time()))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self._last_submit[tag] = now
+        return True
+
+    def _name(self, prefix, timestamp, tag, extension):
+        name = prefix + time.strftime("%Y%m%d_%H%M%S", time.localtime(timestamp))
+        if tag:
+            name += "_" + re.sub(r"[^A-Za-z0-9]+", "-", tag).strip("-")
+        path = os.path.join(self.directory, name + extension)
+        suffix = 1
+        while os.path.exists(path):  # Several frames within the same second
+            path = os.path.join(self.directory, f"{name}_{suffix}{extension}")
+            suffix += 1
+        return path
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            frame, tag, timestamp = item
+            try:
+                if self.fmt == "jpg":
+                    self._write_jpeg(frame, tag, timestamp)
+                else:
+                    self._write_segment(frame, timestamp)
+                self._enforce_retention()
+            except (OSError, cv2.error) as e:
+                print(f"[ERROR] Frame archive write failed: {e}")
+        self._close_segment()
+
+    def _write_jpeg(self, frame, tag, timestamp):
+        path = self._name("frame_", timestamp, tag, ".jpg")
+        if not cv2.imwrite(path, frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality]):
+            raise OSError(f"Couldn't write {path}")
+        self._add_file(path)
+        self.written += 1
+
+    def _write_segment(self, frame, timestamp):
+        if self._segment is not None:
+            _, _, started, shape = self._segment
+            if timestamp - started >= self.segment_seconds or shape != frame.shape:
+                self._close_segment()
+        if self._segment is None:
+            path = self._name("segment_", timestamp, None, ".mp4")
+            height, width = frame.shape[:2]
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), SEGMENT_FPS, (width, height))
+            if not writer.isOpened():
+                raise OSError(f"Couldn't open video segment {path}")
+            self._segment = (writer, path, timestamp, frame.shape)
+        self._segment[0].write(frame)
+        self.written += 1
+
+    def _close_segment(self):
+        if self._segment is not None:
+            writer, path, _, _ = self._segment
+            writer.release()
+            self._segment = None
+            self._add_file(path)
+
+    def _add_file(self, path):
+        size = os.path.getsize(path)
+        self._files.append((path, time.time(), size))
+        self._total_bytes += size
+
+    def _enforce_retention(self):
+        """Delete the oldest archives until both the size and the age budgets hold."""
+        cutoff = time.time() - self.max_age
+        while self._files and (self._total_bytes > self.max_bytes or self._files[0][1] < cutoff):
+            path, _, size = self._files.popleft()
+            self._total_bytes -= size
+            try:
+                os.remove(path)
+                self.deleted += 1
+            except FileNotFoundError:
+                pass
+
+    def stop(self, timeout=5.0):
+        """Write out what is queued, close any open segment and stop the writer."""
+        self.running = False
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            print("[ERROR] Frame archive writer is stuck; queued frames are lost.")
+            return
+        self._thread.join(timeout)
@@ -0,0 +1,233 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+RING_SIZE = 4  # Frames kept before a slot is overwritten
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+DEFAULT_FILE_FPS = 15  # Playback rate for image directories and video files
+
+
+class CameraSource:
+    """Frame source backed by a cv2.VideoCapture device or video file."""
+
+    def __init__(self, device=0, width=None, height=None, fps=None):
+        self.cap = cv2.VideoCapture(device)
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+        # Live cameras pace themselves; video files are replayed at their own rate.
+        self.live = isinstance(device, int)
+        if fps is None and not self.live:
+            fps = self.cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FILE_FPS
+        self.frame_interval = 1.0 / fps if fps else 0.0
+        self.exhausted = False
+
+    def read(self, out=None):
+        """Decode the next frame, into `out` when its shape matches."""
+        ret, frame = self.cap.read(out) if out is not None else self.cap.read()
+        if not ret:
+            # A camera can drop a frame and recover; a video file cannot.
+            self.exhausted = not self.live or not self.cap.isOpened()
+            return None
+        return frame
+
+    def release(self):
+        self.cap.release()
+
+
+class DirectorySource:
+    """Frame source replaying still images, e.g. the saved_frames/ snapshots."""
+
+    def __init__(self, path, fps=DEFAULT_FILE_FPS, loop=True):
+        if os.path.isdir(path):
+            self.paths = sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        else:
+            self.paths = [path]
+        if not self.paths:
+            raise ValueError(f"No images found in {path}")
+
+        self.live = False
+        self.loop = loop
+        self.frame_interval = 1.0 / fps if fps else 0.0
+        self.exhausted = False
+        self.index = 0
+
+    def read(self, out=None):
+        """Decode the next image, into `out` when its shape matches."""
+        if self.index >= len(self.paths):
+            if not self.loop:
+                self.exhausted = True
+                return None
+            self.index = 0
+
+        frame = cv2.imread(self.paths[self.index])
+        self.index += 1
+        if frame is None:
+            print(f"[ERROR] Couldn't decode {self.paths[self.index - 1]}")
+            return None
+        if out is not None and out.shape == frame.shape:
+            np.copyto(out, frame)
+            return out
+        return frame
+
+    def release(self):
+        pass
+
+
+def open_source(spec=0, fps=None, loop=True):
+    """Open a camera index, video file, image file or image directory."""
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec))
+    if os.path.isdir(spec) or spec.lower().endswith(IMAGE_EXTENSIONS):
+        return DirectorySource(spec, fps=fps or DEFAULT_FILE_FPS, loop=loop)
+    return CameraSource(spec, fps=fps)
+
+
+class FrameSubscription:
+    """A consumer's cursor into a FrameHub, read like a cv2.VideoCapture."""
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.seq = 0
+        self.dropped = 0  # Frames published but never seen by this consumer
+
+    def read(self, timeout=1.0):
+        """Return (ret, frame) for the first frame newer than the last one read."""
+        seq, frame = self.hub.wait_for(self.seq, timeout)
+        if frame is None:
+            return False, None
+        if self.seq:
+            self.dropped += seq - self.seq - 1
+        self.seq = seq
+        return True, frame
+
+    def latest(self):
+        """Return (ret, frame) without blocking, only if a new frame is available."""
+        seq, frame = self.hub.latest()
+        if frame is None or seq == self.seq:
+            return False, None
+        self.seq = seq
+        return True, frame
+
+
+class FrameHub:
+    """Single capture thread publishing into a ring of preallocated frames.
+
+    Consumers receive read-only views of the ring slots, so a frame is decoded
+    once however many consumers run. A view stays valid until the producer
+    wraps around the ring; consumers that keep a frame longer must copy it.
+    """
+
+    def __init__(self, source, ring_size=RING_SIZE):
+        self.source = source
+        self.ring_size = ring_size
+        self._slots = [None] * ring_size
+        self._timestamps = [0.0] * ring_size
+        self._seq = 0  # Sequence number of the newest published frame (0 = none yet)
+        self._cond = threading.Condition()
+        self._thread = None
+        self.running = False
+        self.finished = False  # Set once the source has no more frames
+
+    def start(self):
+        """Start the capture thread (no-op if it is already running)."""
+        if self._thread and self._thread.is_alive():
+            return self
+        self.running = True
+        self.finished = False
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop capturing and release the source."""
+        self.running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self.source.release()
+        with self._cond:
+            self.finished = True
+            self._cond.notify_all()
+
+    def subscribe(self):
+        return FrameSubscription(self)
+
+    def _allocate(self, frame):
+        """Preallocate every ring slot to the shape of the first decoded frame."""
+        for index in range(self.ring_size):
+            if self._slots[index] is None or self._slots[index].shape != frame.shape:
+                self._slots[index] = np.empty_like(frame)
+
+    def _capture_loop(self):
+        next_due = time.monotonic()
+        while self.running:
+            seq = self._seq + 1
+            index = seq % self.ring_size
+            slot = self._slots[index]
+
+            frame = self.source.read(slot)
+            if frame is None:
+                if self.source.exhausted:
+                    break
+                print("[ERROR] Couldn't read frame from source!")
+                time.sleep(0.05)
+                continue
+
+            if frame is not slot:
+                if slot is None or slot.shape != frame.shape:
+                    self._allocate(frame)
+                    slot = self._slots[index]
+                np.copyto(slot, frame)
+
+            with self._cond:
+                self._timestamps[index] = time.time()
+                self._seq = seq
+                self._cond.notify_all()
+
+            # File sources are paced to their frame rate; cameras block in read().
+            if self.source.frame_interval:
+                next_due += self.source.frame_interval
+                delay = next_due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_due = time.monotonic()
+
+        with self._cond:
+            self.finished = True
+            self._cond.notify_all()
+
+    def _view(self, seq):
+        view = self._slots[seq % self.ring_size].view()
+        view.flags.writeable = False
+        return view
+
+    def latest(self):
+        """Return (seq, frame) for the newest frame without blocking."""
+        with self._cond:
+            if not self._seq:
+                return 0, None
+            return self._seq, self._view(self._seq)
+
+    def timestamp(self, seq):
+        """Return the capture time of a frame still held in the ring."""
+        with self._cond:
+            if seq <= 0 or self._seq - seq >= self.ring_size:
+                return None
+            return self._timestamps[seq % self.ring_size]
+
+    def wait_for(self, after_seq, timeout=None):
+        """Block until a frame newer than `after_seq` exists; return (seq, frame)."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > after_seq or self.finished, timeout):
+                return after_seq, None
+            if self._seq <= after_seq:
+                return after_seq, None
+            return self._seq, self._view(self._seq)
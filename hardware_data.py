@@ -1,41 +1,53 @@
-import serial
 import tkinter as tk
 import speech_recognition as sr
-import pyttsx3
-import openpyxl
 import threading
-import time
+from tts_service import get_speech, INFO
+from audio_capture import get_capture
+from sensor_state import SensorState
+from command_router import CommandRouter
+from serial_reader import SerialReader, SERIAL_PORT
+from sensor_log import SensorLog
+from sensor_history import SensorHistory, seconds_today
 
 class HardwareMonitor:
     def __init__(self, parent):
         """Initialize hardware monitoring and UI in the Health tab."""
         self.parent = parent
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 150)
-        self.arduino = None
+        self.speech = get_speech()
+
+        # Latest reading for voice commands, readable from any thread without touching Tk
+        self.state = SensorState()
+        self.router = CommandRouter()
+        self.router.add("temperature", ["body temperature", "temperature", "how hot am i"],
+                        lambda command: self.describe_field("temperature", "Your current temperature is {} degrees"))
+        self.router.add("roll", ["roll", "tilt"],
+                        lambda command: self.describe_field("roll", "The current roll is {} degrees"))
+        self.router.add("posture", ["posture", "how am i sitting"],
+                        lambda command: self.describe_field("posture", "Your posture is {}"))
+        self.router.add("distance", ["distance", "how far"],
+                        lambda command: self.describe_field("distance", "The sensor distance is {} centimeters"))
+        self.router.add("average_temperature", ["average temperature", "temperature lately"],
+                        lambda command: self.describe_average_temperature())
+        self.router.add("bad_posture_time", ["bad posture today", "how long was my posture bad"],
+                        lambda command: self.describe_bad_posture())
         self.connected = False
 
-        try:
-            self.arduino = serial.Serial('COM5', 9600, timeout=2)
-            time.sleep(2)  # Give time for Arduino to initialize
-            self.connected = True
-            print("Connected to Arduino.")
-        except serial.SerialException:
-            print("No Arduino detected. Health data will not be available.")
-
-        self.wb = openpyxl.Workbook()
-        self.sheet = self.wb.active
-        self.sheet.title = "Sensor Data"
-        self.sheet.append(['Roll', 'Temp', 'Posture', 'Distance', 'Button'])
+        # Batched, append-only log; `python sensor_log.py export` writes the xlsx on demand
+        self.log = SensorLog()
+        # Rollups for questions about the past, e.g. the average temperature over 10 minutes
+        self.history = SensorHistory()
 
         self.health_frame = tk.Frame(self.parent, bg="#1E1E1E")
         self.health_frame.pack(fill=tk.BOTH, expand=True)
+        self.setup_ui()
 
-        if self.connected:
-            self.setup_ui()
-            self.start_monitoring()
-        else:
-            self.show_placeholder_ui()
+        # All serial I/O happens on the reader thread; Tk only gets the newest
+        # reading, throttled, through after()
+        self.reader = SerialReader(
+            SERIAL_PORT, state=self.state, on_reading=self.record,
+            on_update=lambda reading: self.parent.after(0, self.show_reading, reading),
+            on_status=lambda status: self.parent.after(0, self.on_serial_status, status))
+        self.reader.start()
 
     def setup_ui(self):
         self.labels = {
@@ -50,6 +62,8 @@ class HardwareMonitor:
             label.pack(pady=5)
 
     def show_placeholder_ui(self):
+        for label in self.labels.values():
+            label.destroy()
         placeholder_label = tk.Label(
             self.health_frame,
             text="No hardware data available (Arduino not detected)",
@@ -60,78 +74,80 @@ class HardwareMonitor:
         placeholder_label.pack(pady=20)
 
     def speak(self, text):
-        try:
-            self.engine.say(text)
-            self.engine.runAndWait()
-        except Exception as e:
-            print(f"Text-to-Speech Error: {e}")
+        # Wait, so the microphone doesn't pick up the answer as the next command
+        self.speech.say(text, INFO, wait=True)
+
+    def describe_field(self, field, template):
+        """Answer from the latest sensor reading, e.g. "Your current temperature is 36.5 degrees"."""
+        reading = self.state.latest
+        value = getattr(reading, field) if reading is not None else None
+        if value is None:
+            return template.format("unavailable")
+        return template.format(f"{value:g}" if isinstance(value, float) else value)
+
+    def describe_average_temperature(self, minutes=10):
+        average = self.history.mean("temperature", minutes * 60)
+        if average is None:
+            return f"No temperature readings in the last {minutes} minutes"
+        return f"Your average temperature over the last {minutes} minutes was {average:.1f} degrees"
+
+    def describe_bad_posture(self):
+        minutes = round(self.history.bad_posture_seconds(seconds_today()) / 60)
+        if minutes == 0:
+            return "Your posture hasn't been bad today"
+        return f"Your posture was bad for {minutes} minute{'s' if minutes != 1 else ''} today"
 
     def listen_for_commands(self):
         recognizer = sr.Recognizer()
-        mic = sr.Microphone()
+        capture = get_capture()  # Shared, always-open microphone; no per-command calibration
 
-        while True:
+        while capture.running:
             try:
-                with mic as source:
-                    print("Listening for commands...")
-                    recognizer.adjust_for_ambient_noise(source)
-                    audio = recognizer.listen(source)
+                print("Listening for commands...")
+                audio = capture.listen(timeout=None)
+                if audio is None:
+                    continue
 
                 command = recognizer.recognize_google(audio).lower()
                 print(f"Recognized command: {command}")
 
-                if "body temperature" in command:
-                    temp = self.labels["Temperature"].cget("text").split(": ")[1] if ": " in self.labels["Temperature"].cget("text") else "unavailable"
-                    self.speak(f"Your current temperature is {temp}")
-
-                elif "roll" in command:
-                    roll = self.labels["Roll"].cget("text").split(": ")[1] if ": " in self.labels["Roll"].cget("text") else "unavailable"
-                    self.speak(f"The current roll is {roll}")
-
-                else:
-                    self.speak("Sorry, I didn't understand that.")
+                self.speak(self.router.route(command))
 
             except sr.UnknownValueError:
                 print("Could not understand the audio.")
             except sr.RequestError:
                 print("Could not request results from Google Speech Recognition service.")
 
-    def process_data(self):
-        if not self.arduino:
-            return
-
-        try:
-            if self.arduino.in_waiting > 0:
-                data = self.arduino.readline().decode('utf-8').strip()
-                print(f"Received data: {data}")
-
-                data_parts = data.split(", ")
-                if len(data_parts) < 5:
-                    print("Error: Incomplete data received.")
-                    return
-
-                parsed_data = {
-                    "Roll": data_parts[0].split(": ")[1] if len(data_parts) > 0 else 'N/A',
-                    "Temperature": data_parts[1].split(": ")[1] if len(data_parts) > 1 else 'N/A',
-                    "Posture": data_parts[2].split(": ")[1] if len(data_parts) > 2 else 'N/A',
-                    "Distance": data_parts[3].split(": ")[1] if len(data_parts) > 3 else 'N/A',
-                    "Button": data_parts[4].split(": ")[1] if len(data_parts) > 4 else 'N/A',
-                }
-
-                for key, value in parsed_data.items():
-                    self.labels[key].config(text=f"{key}: {value}")
-
-                self.sheet.append(list(parsed_data.values()))
-                self.wb.save('sensor_data.xlsx')
-                print("Data written to Excel")
-
-        except Exception as e:
-            print(f"Error processing data: {e}")
-
-    def update_data(self):
-        self.process_data()
-        self.parent.after(1000, self.update_data)
-
-    def start_monitoring(self):
-        threading.Thread(target=self.listen_for_commands, daemon=True).start()
-        self.update_data()
+    def on_serial_status(self, status):
+        if status == "connected":
+            self.connected = True
+            print("Connected to Arduino.")
+            threading.Thread(target=self.listen_for_commands, daemon=True).start()
+        elif status == "unavailable":
+            print("No Arduino detected. Health data will not be available.")
+            self.show_placeholder_ui()
+        else:
+            self.connected = False
+            print("[ERROR] Lost connection to Arduino.")
+
+    def record(self, reading):
+        """Log and keep history of every reading (runs on the serial reader thread)."""
+        self.log.write(reading)
+        self.history.add(reading)
+
+    def show_reading(self, reading):
+        """Refresh the labels with the newest reading; Tk thread only, no serial I/O."""
+        values = {
+            "Roll": None if reading.roll is None else f"{reading.roll:.2f}°",
+            "Temperature": None if reading.temperature is None else f"{reading.temperature:.2f}°C",
+            "Posture": reading.posture,
+            "Distance": None if reading.distance is None else f"{reading.distance:g} cm",
+            "Button": None if reading.button is None else ("Yes" if reading.button else "No"),
+        }
+        for key, value in values.items():
+            if value is not None and self.labels[key].winfo_exists():
+                self.labels[key].config(text=f"{key}: {value}")
+
+    def stop(self):
+        self.reader.stop()
+        self.log.stop()
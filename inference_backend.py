@@ -0,0 +1,212 @@
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+import cv2
+import numpy as np
+from model_registry import ModelRegistry, YOLOV5_REPO_DIR
+from tracker import iou_matrix
+
+# Detector backend: "torch" (reference), "onnx" (fp32) or "onnx-int8" (dynamic-range quantized)
+DETECTOR_BACKEND = os.environ.get("DRISHTI_DETECTOR_BACKEND", "torch")
+ONNX_THREADS = int(os.environ.get("DRISHTI_ONNX_THREADS", "0"))  # CPU threads per detector; 0 = library default
+INPUT_SIZE = 640
+CONFIDENCE_THRESHOLD = 0.25  # Same defaults as the YOLOv5 hub model
+IOU_THRESHOLD = 0.45
+MAX_DETECTIONS = 1000
+LETTERBOX_COLOR = 114
+MATCH_IOU = 0.5  # Overlap at which two backends are considered to agree on a box
+
+
+class TorchBackend:
+    """Reference backend: the eager PyTorch YOLOv5 hub model."""
+
+    name = "torch"
+
+    def __init__(self, model):
+        self.model = model
+        self.names = model.names
+
+    def __call__(self, frame):
+        """Detect on one frame; returns an (N, 6) array of x1, y1, x2, y2, conf, cls."""
+        return self.model(frame).xyxy[0].cpu().numpy()
+
+
+class OnnxBackend:
+    """ONNX Runtime YOLOv5 on CPU, with the hub model's pre- and post-processing."""
+
+    def __init__(self, onnx_path, threads=ONNX_THREADS, name="onnx"):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.name = name
+
+        # The YOLOv5 exporter stores the class names as a dict literal in the model metadata
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata["names"])
+
+        self._letterbox = np.full((INPUT_SIZE, INPUT_SIZE, 3), LETTERBOX_COLOR, np.uint8)
+        self._input = np.empty((1, 3, INPUT_SIZE, INPUT_SIZE), np.float32)
+
+    def preprocess(self, frame):
+        """Letterbox into the reused input tensor; returns (scale, pad_x, pad_y)."""
+        height, width = frame.shape[:2]
+        scale = min(INPUT_SIZE / height, INPUT_SIZE / width)
+        new_w, new_h = round(width * scale), round(height * scale)
+        pad_x, pad_y = (INPUT_SIZE - new_w) // 2, (INPUT_SIZE - new_h) // 2
+
+        self._letterbox.fill(LETTERBOX_COLOR)
+        self._letterbox[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(
+            frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        np.multiply(self._letterbox.transpose(2, 0, 1), 1 / 255.0, out=self._input[0], casting="unsafe")
+        return scale, pad_x, pad_y
+
+    def __call__(self, frame):
+        """Detect on one frame; returns an (N, 6) array of x1, y1, x2, y2, conf, cls."""
+        scale, pad_x, pad_y = self.preprocess(frame)
+        prediction = self.session.run(None, {self.input_name: self._input})[0][0]  # (anchors, 5 + classes)
+
+        prediction = prediction[prediction[:, 4] > CONFIDENCE_THRESHOLD]
+        scores = prediction[:, 5:] * prediction[:, 4:5]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        keep = confidences > CONFIDENCE_THRESHOLD
+        prediction, class_ids, confidences = prediction[keep], class_ids[keep], confidences[keep]
+        if not len(prediction):
+            return np.empty((0, 6), np.float32)
+
+        # Class-aware NMS by offsetting each class into its own coordinate range
+        xywh = prediction[:, :4].copy()
+        xywh[:, :2] -= xywh[:, 2:] / 2
+        offset = xywh.copy()
+        offset[:, :2] += class_ids[:, None] * 4096
+        keep = cv2.dnn.NMSBoxes(offset.tolist(), confidences.tolist(), CONFIDENCE_THRESHOLD, IOU_THRESHOLD)
+        keep = np.asarray(keep, dtype=np.intp).reshape(-1)[:MAX_DETECTIONS]
+
+        boxes = np.empty((len(keep), 6), np.float32)
+        boxes[:, 0] = (xywh[keep, 0] - pad_x) / scale
+        boxes[:, 1] = (xywh[keep, 1] - pad_y) / scale
+        boxes[:, 2] = boxes[:, 0] + xywh[keep, 2] / scale
+        boxes[:, 3] = boxes[:, 1] + xywh[keep, 3] / scale
+        boxes[:, 4] = confidences[keep]
+        boxes[:, 5] = class_ids[keep]
+        height, width = frame.shape[:2]
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, width)
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, height)
+        return boxes
+
+
+def export_onnx(registry, name="yolov5s"):
+    """Export pinned YOLOv5 weights to ONNX and an int8 copy, and pin both."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    weights_path, = registry.paths(name)
+    onnx_path = os.path.splitext(weights_path)[0] + ".onnx"
+    int8_path = os.path.splitext(weights_path)[0] + "-int8.onnx"
+    export_script = os.path.join(registry.model_dir, YOLOV5_REPO_DIR, "export.py")
+
+    subprocess.run([sys.executable, export_script, "--weights", weights_path, "--include", "onnx",
+                    "--imgsz", str(INPUT_SIZE), "--simplify"], check=True)
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+
+    registry.pin(f"{name}-onnx", [onnx_path])
+    registry.pin(f"{name}-onnx-int8", [int8_path])
+
+
+def make_backend(kind=DETECTOR_BACKEND, registry=None, threads=ONNX_THREADS, name="yolov5s"):
+    """Build the configured detector backend from pinned models."""
+    registry = registry if registry else ModelRegistry()
+    if kind == "torch":
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        return TorchBackend(registry.load_yolov5(name))
+    if kind in ("onnx", "onnx-int8"):
+        onnx_path, = registry.paths(f"{name}-{kind}")
+        return OnnxBackend(onnx_path, threads=threads, name=kind)
+    raise ValueError(f"Unknown detector backend '{kind}' (expected torch, onnx or onnx-int8)")
+
+
+def match_rate(reference, candidate):
+    """Fraction of reference boxes found by the candidate (same class, IoU >= MATCH_IOU)."""
+    if not len(reference):
+        return 1.0 if not len(candidate) else 0.0
+    if not len(candidate):
+        return 0.0
+    overlaps = iou_matrix(reference[:, :4], candidate[:, :4])
+    overlaps[reference[:, 5][:, None] != candidate[:, 5][None, :]] = 0
+    return float((overlaps.max(axis=1) >= MATCH_IOU).mean())
+
+
+def compare_backends(backends, frames):
+    """Run every backend on the same frames; latency per backend, agreement with the first."""
+    latencies = {backend.name: [] for backend in backends}
+    agreement = {backend.name: [] for backend in backends[1:]}
+
+    for frame in frames:
+        reference = None
+        for backend in backends:
+            start = time.perf_counter()
+            boxes = backend(frame)
+            latencies[backend.name].append(time.perf_counter() - start)
+            if reference is None:
+                reference = boxes
+            else:
+                agreement[backend.name].append(match_rate(reference, boxes))
+
+    report = {}
+    for backend in backends:
+        samples = np.array(latencies[backend.name]) * 1000
+        report[backend.name] = {
+            "frames": len(samples),
+            "mean_ms": float(samples.mean()),
+            "p50_ms": float(np.percentile(samples, 50)),
+            "p95_ms": float(np.percentile(samples, 95)),
+        }
+        if backend.name in agreement:
+            report[backend.name]["match_rate"] = float(np.mean(agreement[backend.name]))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or compare YOLOv5 detector backends.")
+    parser.add_argument("command", choices=["export", "compare"])
+    parser.add_argument("--source", default="saved_frames", help="Image directory or video file to compare on")
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8")
+    parser.add_argument("--threads", type=int, default=ONNX_THREADS)
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    if args.command == "export":
+        export_onnx(registry)
+        print(f"Pinned ONNX models in {registry.manifest_path}")
+    else:
+        from frame_hub import open_source
+
+        source = open_source(args.source, loop=False)
+        frames = []
+        while True:
+            frame = source.read()
+            if frame is None:
+                if source.exhausted:
+                    break
+                continue
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        source.release()
+        if not frames:
+            print(f"[ERROR] No frames could be read from {args.source}")
+            sys.exit(1)
+
+        backends = [make_backend(kind, registry, args.threads) for kind in args.backends.split(",")]
+        for backend in backends:
+            backend(frames[0])  # Warm-up outside the timed loop
+        for name, stats in compare_backends(backends, frames).items():
+            print(name, ", ".join(f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+                                  for key, value in stats.items()))
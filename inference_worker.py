@@ -0,0 +1,282 @@
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from collections import deque
+from multiprocessing import shared_memory
+import numpy as np
+from inference_backend import make_backend, DETECTOR_BACKEND, ONNX_THREADS
+from yolo_postprocess import Detections, build_width_table, class_name_table, postprocess
+
+DETECTOR_WORKERS = int(os.environ.get("DRISHTI_DETECTOR_WORKERS", "0"))  # 0 = detect in-process
+SLOTS_PER_WORKER = 2  # Shared-memory frame slots per worker (one running, one queued)
+WORKER_START_TIMEOUT = 120  # Seconds allowed for a worker to load its model
+DETECT_TIMEOUT = 5.0  # Seconds detect() waits for a result; a worker this late is hung and gets restarted
+SUPERVISOR_POLL = 0.5  # Seconds between worker liveness checks
+RESTART_BACKOFF = 1.0  # Seconds before restarting a crashed worker; doubles per consecutive failure
+RESTART_BACKOFF_MAX = 60.0
+MAX_START_FAILURES = 5  # Consecutive failed model loads before a worker is given up on
+
+
+def _worker_main(index, shm_name, frame_shape, slot_count, requests, results,
+                 backend, threads, known_widths, focal_length):
+    """Worker process: detect on shared-memory slots, send back only compact arrays."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slots = np.ndarray((slot_count,) + frame_shape, dtype=np.uint8, buffer=shm.buf)
+    try:
+        try:
+            detector = make_backend(backend, threads=threads)
+            class_names = class_name_table(detector.names)
+            width_table = build_width_table(class_names, known_widths)
+        except Exception as e:
+            results.put(("error", index, f"{type(e).__name__}: {e}"))
+            raise SystemExit(1)  # Reported above; the supervisor backs off before restarting
+        results.put(("ready", index, list(class_names)))
+
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            seq, slot = request
+            detections = postprocess(detector(slots[slot]), width_table, focal_length)
+            results.put(("result", index, seq, slot) + tuple(detections))
+    finally:
+        del slots
+        shm.close()
+
+
+class InferenceWorkerPool:
+    """Round-robin pool of detector processes fed through shared-memory frame slots.
+
+    Frames are copied once into a free slot and only (seq, slot) crosses the
+    process boundary; workers return Detections arrays. Frames are pipelined:
+    submit() returns at once and result() collects, so up to one frame per
+    worker is in flight. Crashed workers are restarted by a supervisor thread
+    with exponential backoff and their in-flight frames are dropped, as are
+    workers that hold a frame longer than DETECT_TIMEOUT (hung); a worker
+    that keeps failing is given up on (see `error`).
+    """
+
+    def __init__(self, frame_shape, workers=1, backend=DETECTOR_BACKEND, threads=ONNX_THREADS,
+                 known_widths=None, focal_length=600, slots_per_worker=SLOTS_PER_WORKER):
+        self.frame_shape = tuple(frame_shape)
+        self.backend = backend
+        self.threads = threads
+        self.known_widths = dict(known_widths or {})
+        self.focal_length = focal_length
+        self.names = None
+        self.restarts = 0
+        self.dropped = 0
+        self.error = None  # Last model load failure reported by a worker
+        self.failed = set()  # Workers given up on after MAX_START_FAILURES
+
+        self._ctx = mp.get_context("spawn")
+        slot_count = workers * slots_per_worker
+        self._shm = shared_memory.SharedMemory(create=True, size=slot_count * int(np.prod(self.frame_shape)))
+        self._slots = np.ndarray((slot_count,) + self.frame_shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._free_slots = deque(range(slot_count))
+        self._results = self._ctx.Queue()
+        self._requests = [self._ctx.Queue() for _ in range(workers)]
+        self._processes = [None] * workers
+        self._ready = [threading.Event() for _ in range(workers)]
+        self._failures = [0] * workers  # Consecutive crashes per worker
+        self._restart_at = [None] * workers  # Monotonic time a crashed worker is respawned
+        self._in_flight = {}  # seq -> (worker index, slot, monotonic submit time)
+        self._waiting = set()  # seqs a detect() call is blocked on
+        self._seq = itertools.count(1)
+        self._next_worker = 0
+
+        self._cond = threading.Condition()
+        self._latest = None  # Newest (seq, Detections) returned by any worker
+        self._done = {}  # seq -> Detections, for detect() callers
+        self.running = True
+
+        for index in range(workers):
+            self._spawn(index)
+        self._supervisor = threading.Thread(target=self._collect_loop, daemon=True)
+        self._supervisor.start()
+
+    def _spawn(self, index):
+        self._ready[index].clear()
+        process = self._ctx.Process(
+            target=_worker_main, daemon=True,
+            args=(index, self._shm.name, self.frame_shape, len(self._slots), self._requests[index], self._results,
+                  self.backend, self.threads, self.known_widths, self.focal_length))
+        process.start()
+        self._processes[index] = process
+
+    def wait_ready(self, timeout=WORKER_START_TIMEOUT):
+        """Block until every worker has loaded its model or been given up on; False if none is ready."""
+        deadline = time.monotonic() + timeout
+        for index, event in enumerate(self._ready):
+            while not event.wait(SUPERVISOR_POLL) and index not in self.failed:
+                if time.monotonic() >= deadline:
+                    return False
+        return any(event.is_set() for event in self._ready)
+
+    def _collect_loop(self):
+        while self.running:
+            try:
+                message = self._results.get(timeout=SUPERVISOR_POLL)
+            except queue.Empty:
+                message = None
+
+            if message is not None and message[0] == "ready":
+                _, index, names = message
+                self.names = names
+                self._failures[index] = 0
+                self._ready[index].set()
+            elif message is not None and message[0] == "error":
+                _, index, self.error = message
+                print(f"[ERROR] Inference worker {index} could not load its model: {self.error}")
+            elif message is not None:
+                _, index, seq, slot = message[:4]
+                detections = Detections(*message[4:])
+                with self._cond:
+                    # A result racing a crash restart has already had its slot reclaimed
+                    if self._in_flight.pop(seq, None) is not None:
+                        self._free_slots.append(slot)
+                    if self._latest is None or seq > self._latest[0]:
+                        self._latest = (seq, detections)
+                    if seq in self._waiting:
+                        self._done[seq] = detections
+                    self._cond.notify_all()
+
+            self._restart_crashed()
+
+    def _restart_crashed(self):
+        now = time.monotonic()
+        for index in self._hung(now):
+            print(f"[ERROR] Inference worker {index} gave no result for {DETECT_TIMEOUT:.0f} s; terminating it.")
+            process = self._processes[index]
+            process.terminate()
+            process.join(timeout=1)
+            if process.is_alive():
+                process.kill()
+                process.join(timeout=1)
+        for index, process in enumerate(self._processes):
+            if not self.running or index in self.failed or process.is_alive():
+                continue
+            if self._restart_at[index] is None:
+                self._crashed(index, process.exitcode, now)
+            elif now >= self._restart_at[index]:
+                self._requests[index] = self._ctx.Queue()
+                self.restarts += 1
+                self._spawn(index)
+                self._restart_at[index] = None
+
+    def _hung(self, now):
+        """Ready workers holding a frame longer than DETECT_TIMEOUT (loading a model isn't hanging)."""
+        with self._cond:
+            return {worker for worker, _, submitted in self._in_flight.values()
+                    if now - submitted > DETECT_TIMEOUT and self._ready[worker].is_set()}
+
+    def _crashed(self, index, exitcode, now):
+        """Drop the dead worker's frames and schedule its restart, or give up on it."""
+        with self._cond:
+            lost = [seq for seq, (worker, _, _) in self._in_flight.items() if worker == index]
+            for seq in lost:
+                _, slot, _ = self._in_flight.pop(seq)
+                self._free_slots.append(slot)
+            self.dropped += len(lost)
+            self._failures[index] += 1
+            failures = self._failures[index]
+            delay = min(RESTART_BACKOFF * 2 ** (failures - 1), RESTART_BACKOFF_MAX)
+            if failures >= MAX_START_FAILURES:
+                self.failed.add(index)
+            else:
+                self._restart_at[index] = now + delay  # submit() skips the worker until then
+            self._cond.notify_all()
+
+        if index in self.failed:
+            print(f"[ERROR] Inference worker {index} failed {failures} times in a row; giving up on it.")
+            if not self.available:
+                print(f"[ERROR] No inference workers left: {self.error or 'workers keep crashing'}")
+        else:
+            print(f"[ERROR] Inference worker {index} exited (code {exitcode}); restarting in {delay:.0f} s.")
+
+    @property
+    def available(self):
+        """False once every worker has been given up on."""
+        return len(self.failed) < len(self._processes)
+
+    def _pick_worker(self):
+        """Next worker in turn that has its model loaded and isn't restarting or given up on, or None."""
+        count = len(self._processes)
+        for offset in range(count):
+            index = (self._next_worker + offset) % count
+            if index not in self.failed and self._restart_at[index] is None and self._ready[index].is_set():
+                self._next_worker = (index + 1) % count
+                return index
+        return None
+
+    def submit(self, frame, wait=False):
+        """Queue a frame for detection; returns its seq, or None if every slot or worker is busy."""
+        if frame.shape != self.frame_shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match the pool's {self.frame_shape}")
+        with self._cond:
+            index = self._pick_worker() if self._free_slots else None
+            if index is None:
+                self.dropped += 1
+                return None
+            slot = self._free_slots.popleft()
+            seq = next(self._seq)
+            self._in_flight[seq] = (index, slot, time.monotonic())
+            if wait:
+                self._waiting.add(seq)
+
+        np.copyto(self._slots[slot], frame)
+        self._requests[index].put((seq, slot))
+        return seq
+
+    def poll(self, after_seq=0, timeout=None):
+        """Newest (seq, Detections) later than `after_seq`, waiting up to `timeout`."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._latest is not None and self._latest[0] > after_seq, timeout)
+            if self._latest is None or self._latest[0] <= after_seq:
+                return after_seq, None
+            return self._latest
+
+    def result(self, seq, timeout=None):
+        """(finished, Detections) for a frame submitted with wait=True.
+
+        finished is False if it is still in flight after `timeout` (0 = just
+        check); Detections is None if the frame was lost to a crash.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: seq in self._done or seq not in self._in_flight, timeout)
+            if seq not in self._done and seq in self._in_flight:
+                return False, None
+            self._waiting.discard(seq)
+            return True, self._done.pop(seq, None)
+
+    def cancel(self, seq):
+        """Stop waiting for a frame's result; it is discarded when it arrives."""
+        with self._cond:
+            self._waiting.discard(seq)
+            self._done.pop(seq, None)
+
+    def detect(self, frame, timeout=DETECT_TIMEOUT):
+        """Detect on one frame synchronously; returns Detections or None if dropped."""
+        seq = self.submit(frame, wait=True)
+        if seq is None:
+            return None
+        finished, detections = self.result(seq, timeout)
+        if not finished:
+            self.cancel(seq)
+        return detections
+
+    def stop(self):
+        """Stop the workers and free the shared memory."""
+        self.running = False
+        for requests in self._requests:
+            requests.put(None)
+        for process in self._processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        del self._slots
+        self._shm.close()
+        self._shm.unlink()
@@ -3,17 +3,35 @@ import threading
 from ui import DristhiApp
 from object_distance_detector import ObjectDistanceDetector
 
+detector = None  # Created by run_detection once the UI is on screen
+
+
+def describe_front(command):
+    """Answer "what's in front" from the detector's latest announcement."""
+    if detector is None or not detector.last_description:
+        return "Nothing detected in front of you"
+    return detector.last_description
+
+
 def run_detection(app):
     """Start object & distance detection using shared camera feed."""
-    detector = ObjectDistanceDetector(update_ui_callback=app.update_camera_display, shared_cap=app.cap)
+    global detector
+    detector = ObjectDistanceDetector(update_ui_callback=app.update_camera_display, frame_hub=app.frame_hub)
+    app.set_read_text_callback(detector.read_text)
+    if not detector.headless:
+        app.set_overlay_source(lambda: detector.overlay)
     detector.detect_objects_and_distance()
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = DristhiApp(root)
 
-    # Start detection thread
+    # Every voice command is registered before the voice and detection threads start
+    app.hardware_monitor.router.add(
+        "whats_in_front", ["what's in front", "what is in front", "what do you see"], describe_front)
+
+    # Start detection (and its background model loading) once the UI is on screen
     detection_thread = threading.Thread(target=run_detection, args=(app,), daemon=True)
-    detection_thread.start()
+    root.after_idle(detection_thread.start)
 
     root.mainloop()
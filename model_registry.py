@@ -0,0 +1,187 @@
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import sys
+import threading
+import time
+
+# Local model cache: weights plus manifest.json pinning each file's SHA-256
+MODEL_DIR = os.environ.get("DRISHTI_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+MANIFEST_NAME = "manifest.json"
+YOLOV5_WEIGHTS_URL = "https://github.com/ultralytics/yolov5/releases/download/v7.0/{name}.pt"
+YOLOV5_REPO_DIR = "yolov5"  # Local copy of the ultralytics/yolov5 hub code
+EASYOCR_FILES = ("craft_mlt_25k.pth", "english_g2.pth")
+
+
+def sha256_file(path):
+    """SHA-256 of a file, hashed straight from a memory map."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+
+class ModelRegistry:
+    """Checksum-pinned model files in a local cache, loadable with no network access."""
+
+    def __init__(self, model_dir=MODEL_DIR):
+        self.model_dir = model_dir
+        self.manifest_path = os.path.join(model_dir, MANIFEST_NAME)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        self._verified = set()
+
+    def pin(self, name, paths):
+        """Copy files into the cache and record their checksums under `name`."""
+        os.makedirs(self.model_dir, exist_ok=True)
+        files = {}
+        for path in paths:
+            target = os.path.join(self.model_dir, os.path.basename(path))
+            if os.path.abspath(path) != os.path.abspath(target):
+                shutil.copyfile(path, target)
+            files[os.path.basename(path)] = sha256_file(target)
+
+        self.manifest[name] = {"files": files}
+        with open(self.manifest_path, "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        self._verified.discard(name)
+
+    def paths(self, name):
+        """Verified local paths of every file pinned under `name`."""
+        if name not in self.manifest:
+            raise FileNotFoundError(
+                f"Model '{name}' is not in {self.manifest_path}. Run `python model_registry.py fetch` once while online.")
+
+        files = self.manifest[name]["files"]
+        paths = [os.path.join(self.model_dir, filename) for filename in files]
+        if name not in self._verified:
+            for path, expected in zip(paths, files.values()):
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"Pinned model file {path} is missing.")
+                if sha256_file(path) != expected:
+                    raise ValueError(f"Checksum mismatch for {path}; re-run `python model_registry.py fetch`.")
+            self._verified.add(name)
+        return paths
+
+    def fetch_yolov5(self, name="yolov5s"):
+        """Download YOLOv5 weights and hub code once, then pin them (needs network)."""
+        import torch
+
+        download_path = os.path.join(self.model_dir, f"{name}.pt")
+        os.makedirs(self.model_dir, exist_ok=True)
+        if not os.path.exists(download_path):
+            torch.hub.download_url_to_file(YOLOV5_WEIGHTS_URL.format(name=name), download_path)
+        self.pin(name, [download_path])
+
+        repo_dir = os.path.join(self.model_dir, YOLOV5_REPO_DIR)
+        if not os.path.isdir(repo_dir):
+            torch.hub.load("ultralytics/yolov5", "custom", path=download_path, trust_repo=True)
+            shutil.copytree(os.path.join(torch.hub.get_dir(), "ultralytics_yolov5_master"), repo_dir)
+
+    def fetch_easyocr(self, name="easyocr"):
+        """Download the EasyOCR English models once, then pin them (needs network)."""
+        import easyocr
+
+        easyocr.Reader(["en"], model_storage_directory=self.model_dir, verbose=False)
+        self.pin(name, [os.path.join(self.model_dir, filename) for filename in EASYOCR_FILES])
+
+    def load_yolov5(self, name="yolov5s"):
+        """Load pinned YOLOv5 weights from the local hub code, never touching the network."""
+        import torch
+
+        weights_path, = self.paths(name)
+        repo_dir = os.path.join(self.model_dir, YOLOV5_REPO_DIR)
+        return torch.hub.load(repo_dir, "custom", path=weights_path, source="local", verbose=False)
+
+    def load_easyocr(self, name="easyocr", languages=("en",)):
+        """Build an EasyOCR reader from pinned models with downloads disabled."""
+        import easyocr
+
+        self.paths(name)
+        return easyocr.Reader(list(languages), model_storage_directory=self.model_dir,
+                              download_enabled=False, verbose=False)
+
+
+class ModelLoader:
+    """Loads and warms models on background threads, timing each one."""
+
+    def __init__(self):
+        self.timings = {}  # name -> (load seconds, warm-up seconds)
+        self._models = {}
+        self._errors = {}
+        self._ready = {}
+        self._lock = threading.Lock()
+
+    def load_async(self, name, load_fn, warmup_fn=None):
+        """Start loading `name` in the background (no-op if already started)."""
+        with self._lock:
+            if name in self._ready:
+                return
+            self._ready[name] = threading.Event()
+        threading.Thread(target=self._load, args=(name, load_fn, warmup_fn), daemon=True).start()
+
+    def _load(self, name, load_fn, warmup_fn):
+        try:
+            start = time.perf_counter()
+            model = load_fn()
+            loaded = time.perf_counter()
+            if warmup_fn:
+                warmup_fn(model)
+            self.timings[name] = (loaded - start, time.perf_counter() - loaded)
+            self._models[name] = model
+        except Exception as e:
+            print(f"[ERROR] Couldn't load model '{name}': {e}")
+            self._errors[name] = e
+        finally:
+            self._ready[name].set()
+
+    def get(self, name, timeout=None):
+        """Block until `name` is loaded and return it (re-raises its load error)."""
+        if not self._ready[name].wait(timeout):
+            raise TimeoutError(f"Model '{name}' is still loading.")
+        if name in self._errors:
+            raise self._errors[name]
+        return self._models[name]
+
+    def is_ready(self, name):
+        return name in self._ready and self._ready[name].is_set()
+
+    def report(self):
+        """Startup-time report: one line per model with load and warm-up time."""
+        lines = ["Model startup times:"]
+        for name, event in self._ready.items():
+            if name in self.timings:
+                load_s, warmup_s = self.timings[name]
+                lines.append(f"  {name}: load {load_s:.2f} s, warm-up {warmup_s:.2f} s")
+            elif name in self._errors:
+                lines.append(f"  {name}: failed ({self._errors[name]})")
+            elif not event.is_set():
+                lines.append(f"  {name}: still loading")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    registry = ModelRegistry()
+    command = sys.argv[1] if len(sys.argv) > 1 else "report"
+
+    if command == "fetch":
+        registry.fetch_yolov5()
+        registry.fetch_easyocr()
+        print(f"Pinned models in {registry.manifest_path}")
+    elif command == "report":
+        loader = ModelLoader()
+        loader.load_async("yolov5s", registry.load_yolov5)
+        loader.load_async("easyocr", registry.load_easyocr)
+        for name in ("yolov5s", "easyocr"):
+            try:
+                loader.get(name)
+            except Exception:
+                pass
+        print(loader.report())
+    else:
+        print("Usage: python model_registry.py [fetch|report]")
@@ -1,36 +1,34 @@
 import os
 import googlemaps
 import speech_recognition as sr
-import pyttsx3
 import time
 import re
 from geopy.distance import geodesic
+from tts_service import get_speech, NAVIGATION
+from audio_capture import get_capture
 
 # ✅ Set up Google Maps API Key
 GOOGLE_MAPS_API_KEY = "GOOGLE MAPS API KEY"  # 🔹 Replace with your API key
 gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
 
-# ✅ Initialize Text-to-Speech Engine
-engine = pyttsx3.init()
-engine.setProperty("rate", 150)  # Adjust speech speed
-
 def speak(text):
     """Convert text to speech and ensure it plays fully before proceeding."""
-    engine.say(text)
-    engine.runAndWait()
+    # Shared engine: obstacle warnings and SOS still cut in ahead of directions
+    get_speech().say(text, NAVIGATION, wait=True)
 
 def listen_for_location():
     """Capture voice input for destination and retry if unclear."""
     recognizer = sr.Recognizer()
+    capture = get_capture()  # Shared, always-open microphone
 
     for _ in range(3):  # Retry up to 3 times
-        with sr.Microphone() as source:
-            print("Listening for destination...")
-            speak("Where do you want to go?")
-            recognizer.adjust_for_ambient_noise(source)
-            audio = recognizer.listen(source)
+        print("Listening for destination...")
+        speak("Where do you want to go?")
+        audio = capture.listen()  # Starts after the prompt, so it doesn't hear itself
 
         try:
+            if audio is None:
+                raise sr.UnknownValueError()
             location = recognizer.recognize_google(audio).strip()
             print(f"User said: {location}")
 
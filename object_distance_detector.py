@@ -1,14 +1,21 @@
-import cv2
-import torch
-import easyocr
-import pyttsx3
+import os
 import threading
 import time
 import numpy as np
-import mediapipe as mp
-
-# Initialize MediaPipe for face detection
-mp_face_detection = mp.solutions.face_detection
+from frame_hub import FrameHub, CameraSource
+from detection_scheduler import SceneChangeScheduler, MIN_DETECTION_INTERVAL, MAX_DETECTION_INTERVAL
+from yolo_postprocess import build_width_table, class_name_table, describe, postprocess, APPROACHING_SPEED
+from tracker import IoUTracker
+from model_registry import ModelRegistry, ModelLoader
+from inference_backend import make_backend, DETECTOR_BACKEND, ONNX_THREADS
+from inference_worker import InferenceWorkerPool, DETECTOR_WORKERS, DETECT_TIMEOUT
+from text_reader import TextReader
+from face_stage import FaceStage
+from overlay import OverlayRenderer
+from pipeline import (Pipeline, HubSource, GateStage, PreprocessStage, ObjectStage, PooledObjectStage,
+                      FaceDetectionStage, DistanceStage, SmoothingStage, AnnounceStage, RenderStage, ArchiveStage)
+from frame_archive import FrameArchiver, ARCHIVE_ENABLED
+from tts_service import get_speech, OBSTACLE, INFO
 
 # Constants for Distance Measurement
 KNOWN_WIDTHS = {  
@@ -19,25 +26,82 @@ KNOWN_WIDTHS = {
     "face": 14.0  # Average face width (cm)
 }
 FOCAL_LENGTH = 600  
-DETECTION_INTERVAL = 8  # Run detection every 8 seconds
-SMOOTHING_WINDOW_SIZE = 10  
-history = []
+ANNOUNCE_INTERVAL = 3.0  # Seconds between obstacle announcements, however often the scene changes
+ANNOUNCE_REPEAT = 8.0  # Seconds before an unchanged scene is announced again
+DISTANCE_STEP = 50.0  # cm a distance must move (across a step) to count as a change
+WARMUP_FRAME_SHAPE = (480, 640, 3)  # Blank frame run once so the first real pass isn't slow
+HEADLESS = os.environ.get("DRISHTI_HEADLESS", "0") == "1"  # No debug window and no drawing at all
+DEBUG_WINDOW_NAME = "Object & Distance Detection"
 
 
 class ObjectDistanceDetector:
-    def __init__(self, update_ui_callback=None, shared_cap=None):
+    def __init__(self, update_ui_callback=None, frame_hub=None,
+                 min_interval=MIN_DETECTION_INTERVAL, max_interval=MAX_DETECTION_INTERVAL, model_loader=None,
+                 backend=DETECTOR_BACKEND, threads=ONNX_THREADS, workers=DETECTOR_WORKERS, headless=HEADLESS,
+                 archiver=None):
         """Initialize object & distance detection along with text-to-speech."""
-        self.tts_engine = pyttsx3.init()
-        self.tts_engine.setProperty('rate', 150)  # Adjust speech speed
-        
-        self.model = torch.hub.load('ultralytics/yolov5', 'yolov5s', force_reload=True)  # YOLOv5 model
-        self.reader = easyocr.Reader(['en'])  # OCR reader for text detection
-        self.face_detection = mp_face_detection.FaceDetection(min_detection_confidence=0.3)  # Face detector
+        self.speech = get_speech()  # Shared with every other part of the app that talks
+
+        # Pinned local models, loaded and warmed in the background with no network access
+        self.registry = ModelRegistry()
+        self.models = model_loader if model_loader else ModelLoader()
+        self.backend = backend
+        self.threads = threads
+        self.workers = workers  # > 0 runs YOLO in that many worker processes instead of this one
+        if not workers:
+            self.models.load_async("detector", lambda: make_backend(backend, self.registry, threads),
+                                   warmup_fn=lambda detector: detector(np.zeros(WARMUP_FRAME_SHAPE, np.uint8)))
+        self.detector = None
+        self.worker_pool = None
+        self.class_names = None
+        self.text_reader = TextReader(self.registry.load_easyocr)  # OCR, loaded on the first "read text"
+        self.face_stage = FaceStage(min_detection_confidence=0.3)  # Face detector, run inside person boxes
 
         self.update_ui_callback = update_ui_callback  # Callback to update UI
-
-        self.cap = shared_cap if shared_cap else cv2.VideoCapture(0)
-        self.running = False  # Flag to control detection loop
+        self.last_description = None  # Latest announcement, for "what's in front" questions
+
+        # Overlays are drawn only by displays that show a frame, never in the detection pass
+        self.headless = headless
+        self.overlay = None  # Latest detection pass, for the debug window and the Tk preview
+        self.debug_renderer = OverlayRenderer()
+
+        # Read from the shared hub; only open the camera ourselves when run standalone
+        self.owns_hub = frame_hub is None
+        self.frame_hub = frame_hub if frame_hub else FrameHub(CameraSource(0)).start()
+
+        # Run inference as soon as the scene changes, skip it while it is static
+        self.scheduler = SceneChangeScheduler(min_interval=min_interval, max_interval=max_interval)
+
+        # Per-object tracks, each with its own distance smoothing and approach speed
+        self.object_tracker = IoUTracker()
+        self.face_tracker = IoUTracker()
+        self.stage_times = {}  # Seconds spent in each stage of the last process_frame() call
+
+        # Per-frame analysis, also run on its own by process_frame() for replays and benchmarks
+        if workers:
+            # One frame in flight per worker process; results come back in frame order
+            object_stage = PooledObjectStage(self._pool, lambda: self.class_names, depth=workers,
+                                             timeout=DETECT_TIMEOUT)
+        else:
+            object_stage = ObjectStage(self.detect, lambda: self.class_names)
+        self.analysis = Pipeline([
+            PreprocessStage(),
+            object_stage,
+            FaceDetectionStage(self.face_stage),
+            DistanceStage(KNOWN_WIDTHS["face"], FOCAL_LENGTH),
+            SmoothingStage(self.object_tracker, self.face_tracker),
+            RenderStage(self.debug_renderer, None if headless else DEBUG_WINDOW_NAME, publish=self._set_overlay),
+        ])
+        # Live loop: newest hub frame -> scene-change gate -> analysis -> speech and UI
+        stages = [GateStage(self.scheduler)] + self.analysis.stages
+        stages.append(AnnounceStage(self._describe, self.speak, min_interval=ANNOUNCE_INTERVAL,
+                                    repeat_interval=ANNOUNCE_REPEAT, on_message=self._announced,
+                                    key=self._scene_key))
+        if archiver is None and ARCHIVE_ENABLED:
+            archiver = FrameArchiver()
+        if archiver is not None:
+            stages.append(ArchiveStage(archiver, self._archive_tag))  # Frames with detections, written off-thread
+        self.pipeline = Pipeline(stages, source=HubSource(self.frame_hub))
 
     def calculate_distance(self, object_name, width_in_pixels):
         """Calculate distance using a pinhole camera model."""
@@ -45,103 +109,139 @@ class ObjectDistanceDetector:
             return (KNOWN_WIDTHS[object_name] * FOCAL_LENGTH) / width_in_pixels
         return None  
 
-    def get_smoothed_distance(self, new_distance):
-        """Smooth distance using a moving average."""
-        if new_distance is not None:
-            history.append(new_distance)
-            if len(history) > SMOOTHING_WINDOW_SIZE:
-                history.pop(0)
-            return np.mean(history)
+    def detect(self, rgb_frame):
+        """YOLO detections for one RGB frame, in-process or on the worker pool (None if dropped)."""
+        if not self.workers:
+            return postprocess(self.detector(rgb_frame), self.width_table, FOCAL_LENGTH)
+        pool = self._pool(rgb_frame)
+        return None if pool is None else pool.detect(rgb_frame)
+
+    def _pool(self, rgb_frame):
+        """The inference worker pool, started on the first frame; None while no worker can detect."""
+        if self.worker_pool is None:
+            # Started on the first frame, since the shared-memory slots are sized to it
+            self.worker_pool = InferenceWorkerPool(rgb_frame.shape, workers=self.workers, backend=self.backend,
+                                                   threads=self.threads, known_widths=KNOWN_WIDTHS,
+                                                   focal_length=FOCAL_LENGTH)
+            if not self.worker_pool.wait_ready():
+                print("[ERROR] Inference workers did not start in time.")
+        if not self.worker_pool.available:
+            if self.pipeline.running:
+                print(f"[ERROR] Object detection unavailable: {self.worker_pool.error or 'workers keep crashing'}")
+                self.pipeline.stop()
+            return None
+        if self.class_names is None:
+            if self.worker_pool.names is None:
+                return None
+            self.class_names = class_name_table(self.worker_pool.names)
+        return self.worker_pool
+
+    def read_text(self, region=None):
+        """Read text on tracked text-bearing objects, or inside an x1, y1, x2, y2 region, and speak it."""
+        _, frame = self.frame_hub.latest()
+        if frame is None:
+            return None
+        frame = frame.copy()  # OCR outlasts the hub's ring slot
+
+        if region is not None:
+            text = self.text_reader.read_region(frame, region)
+            found = [("text", text)] if text else []
+        elif self.class_names is not None and self.object_tracker.tracks:
+            now = time.monotonic()
+            tracks = list(self.object_tracker.tracks)
+            boxes = [track.predict(now) for track in tracks]
+            labels = self.class_names[[track.class_id for track in tracks]]
+            found = self.text_reader.read_objects(frame, boxes, labels)
+        else:
+            found = []
+
+        message = ". ".join(f"{label} says {text}" for label, text in found) if found else "No text found"
+        print(f"Read text: {message}")
+        self.speak(message, INFO, key="read_text")
+        return message
+
+    def speak(self, text, priority=OBSTACLE, key="objects"):
+        """Queue text on the shared speech arbiter; a newer object report replaces an unsaid one."""
+        self.speech.say(text, priority, key=key)
+
+    def load_models(self):
+        """Wait for the detector model; returns False if it can't be used."""
+        if self.workers:
+            print(f"Running object detection in {self.workers} worker process(es).")
+            return True
+        try:
+            self.detector = self.models.get("detector")  # YOLOv5 (torch or ONNX Runtime backend)
+        except Exception as e:
+            print(f"[ERROR] Object detection unavailable: {e}")
+            return False
+        print(self.models.report())
+        self.class_names = class_name_table(self.detector.names)  # Label per class id
+        self.width_table = build_width_table(self.class_names, KNOWN_WIDTHS)  # Known width per class id
+        return True
+
+    def process_frame(self, frame):
+        """Run the analysis stages on one BGR frame.
+
+        Returns (labels, smoothed distances, approach speeds), or None if the
+        frame was dropped, and records per-stage seconds in `stage_times`.
+        With worker processes the results can belong to an earlier frame,
+        since up to one frame per worker is in flight.
+        """
+        ctx = self.analysis.process_frame(frame)
+        self.stage_times = self.analysis.last_times
+        if ctx is None:
+            return None
+        return ctx.labels, ctx.distances, ctx.approach_speeds
+
+    def _describe(self, ctx):
+        """What to announce for a frame: each object, its distance and whether it is approaching."""
+        if len(ctx.labels):
+            return describe(ctx.labels, ctx.distances, ctx.approach_speeds)
         return None
 
-    def speak(self, text):
-        """Convert text to speech asynchronously."""
-        threading.Thread(target=lambda: self._speak(text), daemon=True).start()
+    def _scene_key(self, ctx):
+        """What makes an announcement new: the objects, their distance steps and who is approaching."""
+        speeds = ctx.approach_speeds if len(ctx.approach_speeds) == len(ctx.labels) else np.zeros(len(ctx.labels))
+        return sorted((label, -1 if not np.isfinite(distance) else int(distance // DISTANCE_STEP),
+                       bool(speed >= APPROACHING_SPEED))
+                      for label, distance, speed in zip(ctx.labels, ctx.distances, speeds))
+
+    def _archive_tag(self, ctx):
+        """Archive frames with detections, tagged with the classes seen."""
+        if len(ctx.labels):
+            return "-".join(sorted(set(ctx.labels)))
+        return None
 
-    def _speak(self, text):
-        """Speak text."""
-        self.tts_engine.say(text)
-        self.tts_engine.runAndWait()
+    def _announced(self, text):
+        self.last_description = text
+        print(f"Detected: {text}")
+        if self.update_ui_callback:
+            self.update_ui_callback(text)
+
+    def _set_overlay(self, overlay):
+        self.overlay = overlay
 
     def detect_objects_and_distance(self):
-        """Detect objects and measure distances every 8 seconds."""
+        """Detect objects and measure distances whenever the scene changes."""
         def run_detection():
-            self.running = True
-            while self.running:
-                ret, frame = self.cap.read()
-                if not ret:
-                    print("[ERROR] Couldn't read frame from webcam!")
-                    break
-
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-                # ✅ Face Detection
-                face_results = self.face_detection.process(rgb_frame)
-                detected_distances = {}  
-
-                if face_results.detections:
-                    for detection in face_results.detections:
-                        bboxC = detection.location_data.relative_bounding_box
-                        ih, iw, _ = frame.shape
-                        bbox = int(bboxC.xmin * iw), int(bboxC.ymin * ih), int(bboxC.width * iw), int(bboxC.height * ih)
-
-                        face_width_in_pixels = bbox[2]
-                        face_distance = self.calculate_distance("face", face_width_in_pixels)
-                        smoothed_face_distance = self.get_smoothed_distance(face_distance)
-
-                        detected_distances["face"] = smoothed_face_distance
-                        cv2.rectangle(frame, (bbox[0], bbox[1]), (bbox[0] + bbox[2], bbox[1] + bbox[3]), (255, 0, 0), 2)
-                        cv2.putText(frame, f"Face: {smoothed_face_distance:.2f} cm", (bbox[0], bbox[1] - 10),
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
-
-                # ✅ Object Detection (YOLOv5)
-                results = self.model(frame)
-                detected_objects = []
+            if not self.load_models():
+                return
 
-                for index, row in results.pandas().xyxy[0].iterrows():
-                    x1, y1, x2, y2 = int(row['xmin']), int(row['ymin']), int(row['xmax']), int(row['ymax'])
-                    label = row['name']
+            self.pipeline.run()
+            print(self.pipeline.report())
 
-                    object_width_in_pixels = x2 - x1
-                    object_distance = self.calculate_distance(label, object_width_in_pixels)
-                    smoothed_object_distance = self.get_smoothed_distance(object_distance)
-
-                    detected_distances[label] = smoothed_object_distance
-
-                    # ✅ Prevent NoneType Formatting Error
-                    if smoothed_object_distance is not None:
-                        detected_objects.append(f"{label} ({smoothed_object_distance:.2f} cm)")
-                    else:
-                        detected_objects.append(f"{label} (Unknown distance)")
-
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    cv2.putText(frame, f"{label}: {smoothed_object_distance:.2f} cm" if smoothed_object_distance 
-                                else f"{label}: Unknown",
-                                (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-
-                # ✅ Speak detected objects & their distances every 8 seconds
-                if detected_objects:
-                    detected_str = ", ".join(detected_objects)
-                    print(f"Detected: {detected_str}")
-                    self.speak(detected_str)
-
-                    if self.update_ui_callback:
-                        self.update_ui_callback(detected_str)
-
-                cv2.imshow("Object & Distance Detection", frame)  
-
-                # ✅ Wait for 8 seconds before detecting again
-                time.sleep(DETECTION_INTERVAL)
-
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    self.running = False
-                    break
-
-            self.cap.release()
-            cv2.destroyAllWindows()
+            if self.owns_hub:
+                self.frame_hub.stop()
+            if self.worker_pool:
+                self.worker_pool.stop()
+            self.pipeline.close()
 
         threading.Thread(target=run_detection, daemon=True).start()
 
     def stop(self):
         """Stop object detection."""
-        self.running = False
+        self.pipeline.stop()
+
+    @property
+    def running(self):
+        return self.pipeline.running
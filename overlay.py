@@ -0,0 +1,35 @@
+from collections import namedtuple
+import cv2
+import numpy as np
+
+OBJECT_COLOR = (0, 255, 0)  # BGR
+FACE_COLOR = (255, 0, 0)
+
+# Latest detection pass, kept by the detector so displays can draw it on demand
+Overlay = namedtuple("Overlay", ["boxes", "labels", "distances", "face_boxes", "face_distances"])
+
+
+class OverlayRenderer:
+    """Draws detection overlays into a single reused buffer, only for frames that are shown."""
+
+    def __init__(self):
+        self._buffer = None
+
+    def render(self, frame, overlay):
+        """Copy `frame` into the overlay buffer, draw `overlay` on it and return the buffer."""
+        if self._buffer is None or self._buffer.shape != frame.shape:
+            self._buffer = np.empty_like(frame)
+        np.copyto(self._buffer, frame)
+        if overlay is None:
+            return self._buffer
+
+        for (x1, y1, x2, y2), label, distance in zip(overlay.boxes.tolist(), overlay.labels, overlay.distances):
+            cv2.rectangle(self._buffer, (x1, y1), (x2, y2), OBJECT_COLOR, 2)
+            cv2.putText(self._buffer, f"{label}: {distance:.2f} cm" if np.isfinite(distance) else f"{label}: Unknown",
+                        (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, OBJECT_COLOR, 2)
+
+        for (x1, y1, x2, y2), distance in zip(overlay.face_boxes.tolist(), overlay.face_distances):
+            cv2.rectangle(self._buffer, (x1, y1), (x2, y2), FACE_COLOR, 2)
+            cv2.putText(self._buffer, f"Face: {distance:.2f} cm", (x1, y1 - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, FACE_COLOR, 2)
+        return self._buffer
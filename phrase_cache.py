@@ -0,0 +1,258 @@
+import hashlib
+import os
+import re
+import wave
+from collections import OrderedDict, namedtuple
+import numpy as np
+
+try:
+    import simpleaudio
+except ImportError:  # Optional: without it every phrase is synthesized live
+    simpleaudio = None
+
+PHRASE_CACHE_DIR = os.environ.get("DRISHTI_PHRASE_CACHE_DIR", "tts_cache")  # Rendered WAVs, kept across runs
+PHRASE_CACHE_SIZE = 256  # Fragments kept decoded in memory
+PHRASE_CACHE_MB = float(os.environ.get("DRISHTI_PHRASE_CACHE_MB", "64"))  # Disk cap; least recently used WAVs go first
+REUSE_AFTER = 2  # Times a non-template word must be asked for before it is rendered to disk
+SEEN_SIZE = 4096  # Non-template words whose request counts are remembered
+FRAGMENT_PAUSE = 0.12  # Seconds of silence where a comma splits fragments
+SILENCE_LEVEL = 300  # int16 amplitude below which fragment edges are trimmed
+
+# Rendered while the speech engine is idle, so the usual announcements never wait on synthesis
+PRERENDER_PHRASES = (
+    "Maintain posture.", "No person seen", "You have arrived at your destination.",
+    "Distance is", "centimeters", "cm", "approaching", "Unknown distance",
+    "person", "cell phone", "laptop", "bottle", "chair", "car", "bicycle", "dog",
+)
+PRERENDER_NUMBERS = range(0, 401)  # Distances in cm
+
+Audio = namedtuple("Audio", ["samples", "channels", "sample_rate"])  # int16 samples, interleaved
+PAUSE = ","
+_CM = re.compile(r"\s*(?:cm|centimeters)\b")
+
+
+def exact_number(fragment):
+    """Negative or decimal numbers are one-off: spliced word by word they'd be easy to get wrong.
+
+    >>> exact_number("-12.5"), exact_number("36.5"), exact_number("121"), exact_number("cm")
+    (True, True, False, False)
+    """
+    return fragment[:1] == "-" or (fragment[:1].isdigit() and "." in fragment)
+
+
+def fragments(text):
+    """Split text into reusable fragments: lower-case words, numbers and PAUSE markers.
+
+    Commas and sentence punctuation become pauses; brackets and quotes are dropped.
+    Distances in cm are spoken as whole cm, matching the pre-rendered numbers;
+    every other number keeps its exact text, so a sign or decimal is never lost
+    (see exact_number()).
+
+    >>> fragments("person (120.50 cm, approaching), chair (Unknown distance)")
+    ['person', '121', 'cm', ',', 'approaching', ',', 'chair', 'unknown', 'distance']
+    >>> fragments("Maintain posture.")
+    ['maintain', 'posture']
+    >>> fragments("Left. Then right; stop!")
+    ['left', ',', 'then', 'right', ',', 'stop']
+    >>> fragments("The current roll is -12.5 degrees")
+    ['the', 'current', 'roll', 'is', '-12.5', 'degrees']
+    >>> fragments("Your current temperature is 36.5 degrees. Bottle 0.49 cm, wall 3 cm")
+    ['your', 'current', 'temperature', 'is', '36.5', 'degrees', ',', 'bottle', '0.49', 'cm', ',', 'wall', '3', 'cm']
+    """
+    parts = []
+    for match in re.finditer(r"(?<!\w)-?\d+(?:\.\d+)?|[^\W\d_]+(?:'[^\W\d_]+)?|[,.;:!?]", text):
+        token = match.group()
+        if token[-1].isdigit():
+            whole = int(float(token) + 0.5) if token[0] != "-" else 0
+            if whole >= 1 and _CM.match(text, match.end()):
+                token = str(whole)  # Obstacle distances are pre-rendered as whole cm
+            parts.append(token)
+        elif token in ",.;:!?":
+            if parts and parts[-1] != PAUSE:
+                parts.append(PAUSE)
+        else:
+            parts.append(token.lower())
+    while parts and parts[-1] == PAUSE:
+        parts.pop()
+    return parts
+
+
+# Every fragment of the usual announcements; these are always worth a WAV
+PRERENDER_FRAGMENTS = tuple(dict.fromkeys(fragment for phrase in PRERENDER_PHRASES for fragment in fragments(phrase)
+                                          if fragment != PAUSE)) + tuple(str(n) for n in PRERENDER_NUMBERS)
+TEMPLATE_FRAGMENTS = frozenset(PRERENDER_FRAGMENTS)
+
+
+def read_wav(path):
+    """16-bit PCM WAV as Audio, or None if the file isn't one."""
+    try:
+        with wave.open(path, "rb") as f:
+            if f.getsampwidth() != 2:
+                return None
+            samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+            return Audio(samples, f.getnchannels(), f.getframerate())
+    except (wave.Error, EOFError):
+        return None
+
+
+def trim_silence(audio):
+    """Drop quiet samples at both ends, so joined fragments don't leave gaps."""
+    loud = np.flatnonzero(np.abs(audio.samples) > SILENCE_LEVEL)
+    if not len(loud):
+        return audio
+    start = loud[0] - loud[0] % audio.channels
+    end = loud[-1] + audio.channels - loud[-1] % audio.channels
+    return audio._replace(samples=audio.samples[start:end])
+
+
+def play(audio):
+    """Start playing `audio`; returns a simpleaudio PlayObject (is_playing(), stop())."""
+    return simpleaudio.play_buffer(audio.samples, audio.channels, 2, audio.sample_rate)
+
+
+class PhraseCache:
+    """Rendered speech fragments: an in-memory LRU in front of a size-capped WAV store on disk.
+
+    `render(text, path)` synthesizes text into a WAV file; it is only called
+    for fragments that have never been rendered with this voice before.
+    Only reusable fragments are rendered: template words, numbers and words
+    asked for REUSE_AFTER times. Text with any other word is one-off (OCR
+    results, addresses) and audio() leaves it to the speech engine.
+    """
+
+    def __init__(self, render, voice_key="", directory=PHRASE_CACHE_DIR, size=PHRASE_CACHE_SIZE,
+                 max_mb=PHRASE_CACHE_MB):
+        self.render = render
+        self.voice_key = voice_key  # Voice and rate, so changing either re-renders
+        self.directory = directory
+        self.size = size
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.enabled = simpleaudio is not None  # Cleared if the driver can't render WAV files
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._memory = OrderedDict()
+        self._seen = OrderedDict()  # Non-template word -> times asked for, least recent first
+        self._disk = OrderedDict()  # WAV path -> bytes, least recently used first
+        self._disk_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Index the WAVs already on disk, oldest use first (file mtimes are bumped on use)."""
+        entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".wav")]
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            self._disk[entry.path] = entry.stat().st_size
+            self._disk_bytes += entry.stat().st_size
+        self._evict()
+
+    def _evict(self):
+        """Delete least recently used WAVs until the store fits max_bytes (the newest always stays)."""
+        while self._disk_bytes > self.max_bytes and len(self._disk) > 1:
+            path, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self.evicted += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _touch(self, path):
+        self._disk.move_to_end(path)
+        try:
+            os.utime(path)  # Survives restarts as the LRU order
+        except OSError:
+            pass
+
+    def reusable(self, fragment):
+        """Is `fragment` worth a WAV on disk? Counts requests for non-template words."""
+        if exact_number(fragment):
+            return False  # Said live by the engine, sign and decimals included
+        if fragment in TEMPLATE_FRAGMENTS or fragment.isdigit() or fragment in self._memory:
+            return True
+        count = self._seen.pop(fragment, 0) + 1
+        self._seen[fragment] = count
+        if len(self._seen) > SEEN_SIZE:
+            self._seen.popitem(last=False)
+        return count >= REUSE_AFTER or self.path(fragment) in self._disk
+
+    def path(self, fragment):
+        digest = hashlib.blake2b(f"{self.voice_key}|{fragment}".encode(), digest_size=12).hexdigest()
+        return os.path.join(self.directory, digest + ".wav")
+
+    def prerender(self, fragment):
+        """Render `fragment` to disk if it isn't there yet; returns True if it rendered."""
+        path = self.path(fragment)
+        if path in self._disk:
+            return False
+        return self._render(fragment, path)
+
+    def _render(self, fragment, path):
+        partial = path + ".part"
+        self.render(fragment, partial)
+        if not os.path.exists(partial):
+            return False
+        if read_wav(partial) is None:
+            # Some drivers (e.g. macOS) save AIFF; fall back to live synthesis for good
+            print("[ERROR] Speech driver doesn't render 16-bit WAV; phrase cache disabled.")
+            os.remove(partial)
+            self.enabled = False
+            return False
+        os.replace(partial, path)
+        size = os.path.getsize(path)
+        self._disk_bytes += size - self._disk.pop(path, 0)
+        self._disk[path] = size
+        self._evict()
+        return True
+
+    def fragment(self, fragment):
+        """Decoded, trimmed Audio for one fragment, rendering it on a miss (None if impossible)."""
+        audio = self._memory.get(fragment)
+        if audio is not None:
+            self._memory.move_to_end(fragment)
+            self.hits += 1
+            return audio
+
+        self.misses += 1
+        path = self.path(fragment)
+        if path in self._disk:
+            self._touch(path)
+        elif not self._render(fragment, path):
+            return None
+        audio = read_wav(path)
+        if audio is None:
+            return None
+        audio = trim_silence(audio)
+        self._memory[fragment] = audio
+        if len(self._memory) > self.size:
+            self._memory.popitem(last=False)
+        return audio
+
+    def audio(self, text):
+        """The whole text as one Audio buffer, joined from cached fragments.
+
+        None if the cache is unavailable or the text has one-off words, which
+        are cheaper to synthesize live than to render and store.
+        """
+        if not self.enabled:
+            return None
+        parts = fragments(text)
+        if not all([self.reusable(fragment) for fragment in parts if fragment != PAUSE]):
+            return None  # A list, so every word's request is counted
+        pieces = []
+        fmt = None
+        for fragment in parts:
+            if fragment == PAUSE:
+                pieces.append(None)
+                continue
+            audio = self.fragment(fragment)
+            if audio is None or (fmt is not None and fmt != audio[1:]):
+                return None
+            fmt = audio[1:]
+            pieces.append(audio.samples)
+        if fmt is None:
+            return None
+
+        channels, sample_rate = fmt
+        pause = np.zeros(int(FRAGMENT_PAUSE * sample_rate) * channels, dtype=np.int16)
+        return Audio(np.concatenate([pause if piece is None else piece for piece in pieces]), channels, sample_rate)
@@ -0,0 +1,426 @@
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+import cv2
+import numpy as np
+from overlay import Overlay
+
+TIMING_WINDOW = 256  # Per-stage latency samples kept for stats() and report()
+EMPTY_BOXES = np.empty((0, 4), dtype=np.int32)
+PENDING = "pending"  # Stage result: the frame is held back and comes out of a later call; not a drop
+
+
+def pinhole_distances(known_width, pixel_widths, focal_length):
+    """Distance in cm for each pixel width (NaN where the width is 0)."""
+    pixel_widths = np.asarray(pixel_widths, dtype=np.float32)
+    with np.errstate(divide="ignore"):
+        return np.where(pixel_widths > 0, known_width * focal_length / pixel_widths, np.nan)
+
+
+class FrameContext:
+    """Everything the stages know about one frame; each stage fills in its part."""
+
+    def __init__(self, frame=None, seq=0):
+        self.frame = frame  # BGR; a read-only hub view until a snapshot stage copies it
+        self.seq = seq
+        self.rgb = None
+        self.detections = None  # yolo_postprocess.Detections
+        self.labels = np.empty(0, dtype=object)
+        self.distances = np.empty(0)  # Smoothed per-track object distances
+        self.approach_speeds = np.empty(0)
+        self.face_boxes = EMPTY_BOXES
+        self.face_raw_distances = np.empty(0)
+        self.face_distances = np.empty(0)  # Smoothed per-track face distances
+        self.overlay = None
+
+
+class Stage(ABC):
+    """One pipeline step. process() returns False to drop the frame at this stage.
+
+    A stage that holds frames back returns PENDING for a frame it keeps, and
+    an earlier FrameContext once that one is ready; the remaining stages then
+    run on it.
+    """
+
+    name = "stage"
+
+    @abstractmethod
+    def process(self, ctx):
+        pass
+
+    def close(self):
+        pass
+
+
+class HubSource(Stage):
+    """Source stage: the next frame from a FrameHub subscription (stale frames are skipped)."""
+
+    name = "source"
+
+    def __init__(self, frame_hub, timeout=1.0):
+        self.frame_hub = frame_hub
+        self.frames = frame_hub.subscribe()
+        self.timeout = timeout
+
+    def process(self, ctx):
+        ret, frame = self.frames.read(self.timeout)
+        if not ret:
+            return False
+        ctx.frame, ctx.seq = frame, self.frames.seq
+        return True
+
+    @property
+    def finished(self):
+        return self.frame_hub.finished
+
+
+class SnapshotStage(Stage):
+    """Replaces the hub view with a private copy of the frame.
+
+    The capture thread reuses ring slots a few frames later, so stages that
+    look at ctx.frame after slow inference (rendering, archiving) must not
+    read the slot itself.
+    """
+
+    name = "snapshot"
+
+    def process(self, ctx):
+        ctx.frame = ctx.frame.copy()
+
+
+class GateStage(SnapshotStage):
+    """Drops frames the SceneChangeScheduler says don't need inference; snapshots the rest."""
+
+    name = "gate"
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+
+    def process(self, ctx):
+        if not self.scheduler.should_run(ctx.frame):
+            return False
+        super().process(ctx)  # Only copy frames that go on to inference
+
+
+class PreprocessStage(Stage):
+    """The single BGR -> RGB conversion every model stage shares."""
+
+    name = "preprocess"
+
+    def process(self, ctx):
+        ctx.rgb = cv2.cvtColor(ctx.frame, cv2.COLOR_BGR2RGB)
+
+
+class ObjectStage(Stage):
+    """YOLO detections (with vectorized distances) from a detect(rgb) callable."""
+
+    name = "objects"
+
+    def __init__(self, detect, class_names):
+        self.detect = detect
+        self.class_names = class_names  # Callable: the class-name table, once the model is loaded
+
+    def process(self, ctx):
+        ctx.detections = self.detect(ctx.rgb)
+        if ctx.detections is None:
+            return False
+        ctx.labels = self.class_names()[ctx.detections.class_ids]
+        ctx.distances = ctx.detections.distances
+
+
+class PooledObjectStage(Stage):
+    """YOLO detections from an InferenceWorkerPool with up to `depth` frames in flight.
+
+    Each frame is submitted at once; the stage hands on the oldest submitted
+    frame when its result is in, blocking only when `depth` frames are
+    already waiting, so the workers run in parallel while results stay in
+    frame order. Results therefore lag the newest frame by up to depth - 1
+    frames. pool(rgb) returns the pool, or None while it is unusable.
+    """
+
+    name = "objects"
+
+    def __init__(self, pool, class_names, depth=2, timeout=5.0):
+        self.pool = pool
+        self.class_names = class_names  # Callable: the class-name table, once the model is loaded
+        self.depth = depth
+        self.timeout = timeout
+        self.pending = deque()  # (seq, ctx) in submission order
+        self._pool = None
+
+    def process(self, ctx):
+        self._pool = self.pool(ctx.rgb)
+        if self._pool is None:
+            return False
+        seq = self._pool.submit(ctx.rgb, wait=True)
+        if seq is not None:
+            self.pending.append((seq, ctx))
+        if not self.pending:
+            return False
+
+        seq, oldest = self.pending[0]
+        full = len(self.pending) >= self.depth
+        finished, detections = self._pool.result(seq, self.timeout if full else 0)
+        if not finished and not full:
+            return PENDING if seq is not None else False  # Held frames are handed on by a later call
+        self.pending.popleft()
+        if detections is None:
+            self._pool.cancel(seq)  # Timed out or lost to a worker crash
+            return False
+        oldest.detections = detections
+        oldest.labels = self.class_names()[detections.class_ids]
+        oldest.distances = detections.distances
+        return oldest
+
+    def close(self):
+        if self._pool is not None:
+            for seq, _ in self.pending:
+                self._pool.cancel(seq)
+        self.pending.clear()
+
+
+class FaceDetectionStage(Stage):
+    """FaceStage inside person boxes when objects ran, else on the downscaled frame."""
+
+    name = "faces"
+
+    def __init__(self, face_stage):
+        self.face_stage = face_stage
+
+    def process(self, ctx):
+        person_boxes = None if ctx.detections is None else ctx.detections.boxes[ctx.labels == "person"]
+        ctx.face_boxes = self.face_stage.detect(ctx.rgb, person_boxes)
+
+    def close(self):
+        self.face_stage.close()
+
+
+class DistanceStage(Stage):
+    """Pinhole-model distance for every face box."""
+
+    name = "distance"
+
+    def __init__(self, face_width, focal_length):
+        self.face_width = face_width
+        self.focal_length = focal_length
+
+    def process(self, ctx):
+        ctx.face_raw_distances = pinhole_distances(self.face_width, ctx.face_boxes[:, 2] - ctx.face_boxes[:, 0],
+                                                   self.focal_length)
+
+
+class SmoothingStage(Stage):
+    """Per-track smoothing and approach speed for objects and faces."""
+
+    name = "smoothing"
+
+    def __init__(self, object_tracker=None, face_tracker=None):
+        self.object_tracker = object_tracker
+        self.face_tracker = face_tracker
+
+    @staticmethod
+    def _smooth(tracker, boxes, class_ids, distances):
+        tracks = tracker.update(boxes, class_ids, distances)
+        smoothed = np.array([np.nan if track.distance is None else track.distance for track in tracks])
+        return smoothed, np.array([track.approach_speed for track in tracks])
+
+    def process(self, ctx):
+        if self.object_tracker is not None and ctx.detections is not None:
+            ctx.distances, ctx.approach_speeds = self._smooth(
+                self.object_tracker, ctx.detections.boxes, ctx.detections.class_ids, ctx.detections.distances)
+        if self.face_tracker is not None and len(ctx.face_boxes):
+            ctx.face_distances, _ = self._smooth(
+                self.face_tracker, ctx.face_boxes, np.zeros(len(ctx.face_boxes), np.intp), ctx.face_raw_distances)
+
+
+class AnnounceStage(Stage):
+    """Speaks message(ctx) at most every `min_interval` s.
+
+    The same message is only repeated once `repeat_interval` s have passed
+    (None = only after something else, or nothing, was to be said). With
+    `key`, messages count as the same when key(ctx) is, e.g. when only a
+    distance's decimals changed.
+    """
+
+    def __init__(self, message, speak, min_interval=0.0, repeat_interval=0.0, on_message=None, name="announce",
+                 key=None):
+        self.name = name
+        self.message = message
+        self.speak = speak
+        self.min_interval = min_interval
+        self.repeat_interval = repeat_interval
+        self.on_message = on_message
+        self.key = key
+        self.last_key = None
+        self.last_time = float("-inf")
+
+    def process(self, ctx):
+        text = self.message(ctx)
+        if not text:
+            self.last_key = None
+            return
+        elapsed = time.monotonic() - self.last_time
+        if elapsed < self.min_interval:
+            return
+        key = self.key(ctx) if self.key else text
+        if key == self.last_key and (self.repeat_interval is None or elapsed < self.repeat_interval):
+            return
+        self.last_key, self.last_time = key, time.monotonic()
+        self.speak(text)
+        if self.on_message:
+            self.on_message(text)
+
+
+class CallbackStage(Stage):
+    """Runs an arbitrary fn(ctx), e.g. to publish results to a UI."""
+
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+
+    def process(self, ctx):
+        return self.fn(ctx)
+
+
+class RenderStage(Stage):
+    """Publishes the frame's Overlay and, unless headless, shows it in a debug window."""
+
+    name = "render"
+
+    def __init__(self, renderer=None, window_name=None, publish=None):
+        self.renderer = renderer
+        self.window_name = window_name  # None = headless: no drawing, no GUI calls
+        self.publish = publish
+        self.quit_requested = False
+
+    def process(self, ctx):
+        boxes = EMPTY_BOXES if ctx.detections is None else ctx.detections.boxes
+        ctx.overlay = Overlay(boxes, ctx.labels, ctx.distances, ctx.face_boxes, ctx.face_distances)
+        if self.publish:
+            self.publish(ctx.overlay)
+        if self.window_name is None:
+            return
+        cv2.imshow(self.window_name, self.renderer.render(ctx.frame, ctx.overlay))
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            self.quit_requested = True
+
+    def close(self):
+        if self.window_name is not None:
+            cv2.destroyAllWindows()
+
+
+class ArchiveStage(Stage):
+    """Hands frames to a FrameArchiver when tag(ctx) names an event; never blocks.
+
+    Archives the snapshot taken at the gate, the image the detections came
+    from. Without one, the frame is rebuilt from ctx.rgb, since the hub slot
+    may already hold a later frame.
+    """
+
+    name = "archive"
+
+    def __init__(self, archiver, tag):
+        self.archiver = archiver
+        self.tag = tag
+
+    def process(self, ctx):
+        tag = self.tag(ctx)
+        if not tag:
+            return
+        if ctx.frame.flags.writeable:  # Private snapshot; nothing else writes to it
+            self.archiver.submit(ctx.frame, tag, copy=False)
+        else:
+            self.archiver.submit(cv2.cvtColor(ctx.rgb, cv2.COLOR_RGB2BGR), tag, copy=False)
+
+    def close(self):
+        self.archiver.stop()
+
+
+class Pipeline:
+    """Runs stages in order on each frame, timing every stage.
+
+    Frames reach run() newest-first from the source, so a slow pipeline skips
+    frames instead of queueing them; `max_fps` additionally caps the rate.
+    """
+
+    def __init__(self, stages, source=None, max_fps=None):
+        self.stages = list(stages)
+        self.source = source
+        self.frame_interval = 1.0 / max_fps if max_fps else 0.0
+        self.timings = {stage.name: deque(maxlen=TIMING_WINDOW) for stage in self.stages}
+        if source is not None:
+            self.timings[source.name] = deque(maxlen=TIMING_WINDOW)
+        self.last_times = {}  # Seconds per stage for the most recent frame
+        self.dropped = {}  # Frames dropped, by the stage that dropped them
+        self.running = False
+
+    def process(self, ctx):
+        """Run every stage on `ctx`; returns the finished context, or None if a stage dropped or held it.
+
+        That is an earlier frame's context when a stage holds frames back (PooledObjectStage).
+        """
+        self.last_times = {}
+        for stage in self.stages:
+            start = time.perf_counter()
+            keep = stage.process(ctx)
+            elapsed = time.perf_counter() - start
+            self.timings[stage.name].append(elapsed)
+            self.last_times[stage.name] = elapsed
+            if keep is PENDING:
+                return None
+            if keep is False:
+                self.dropped[stage.name] = self.dropped.get(stage.name, 0) + 1
+                return None
+            if isinstance(keep, FrameContext):
+                ctx = keep
+        return ctx
+
+    def process_frame(self, frame):
+        """Run the stages on a frame supplied by the caller (replay, benchmarks)."""
+        return self.process(FrameContext(frame))
+
+    def run(self):
+        """Pull frames from the source until it ends, stop() is called or a stage asks to quit."""
+        self.running = True
+        while self.running:
+            ctx = FrameContext()
+            start = time.perf_counter()
+            if not self.source.process(ctx):
+                if self.source.finished:
+                    break
+                print("[ERROR] Couldn't read frame from the camera!")
+                continue
+            self.timings[self.source.name].append(time.perf_counter() - start)
+            self.process(ctx)
+            if any(getattr(stage, "quit_requested", False) for stage in self.stages):
+                break
+            remaining = self.frame_interval - (time.perf_counter() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+        self.running = False
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        for stage in self.stages:
+            stage.close()
+
+    def stats(self):
+        """p50/p95 milliseconds per stage plus frames dropped at each stage."""
+        report = {}
+        for name, samples in self.timings.items():
+            if samples:
+                milliseconds = np.asarray(samples) * 1000
+                report[name] = {"p50_ms": float(np.percentile(milliseconds, 50)),
+                                "p95_ms": float(np.percentile(milliseconds, 95)),
+                                "dropped": self.dropped.get(name, 0)}
+        return report
+
+    def report(self):
+        """stats() as text: one line per stage."""
+        lines = ["Pipeline stage times:"]
+        for name, stats in self.stats().items():
+            dropped = f", dropped {stats['dropped']}" if stats["dropped"] else ""
+            lines.append(f"  {name}: p50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms{dropped}")
+        return "\n".join(lines)
@@ -0,0 +1,76 @@
+import os
+import time
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+from overlay import OverlayRenderer
+
+PREVIEW_SIZE = (400, 300)  # Width, height of the Tk camera preview
+PREVIEW_FPS = float(os.environ.get("DRISHTI_PREVIEW_FPS", "15"))  # Target preview refresh rate
+
+
+class TkPreview:
+    """Camera preview that updates one persistent PhotoImage in place.
+
+    Each tick takes the newest captured frame without blocking, resizes it
+    into a reused buffer and pastes it into the PhotoImage. Frames that
+    arrive while the UI is busy are skipped, never queued.
+    """
+
+    def __init__(self, root, label, frame_hub, size=PREVIEW_SIZE, fps=PREVIEW_FPS, overlay_source=None):
+        self.root = root
+        self.label = label
+        self.frames = frame_hub.subscribe()
+        self.size = size
+        self.interval = 1.0 / fps
+        self.overlay_source = overlay_source  # Returns the detector's latest Overlay, or None
+        self.renderer = OverlayRenderer()
+        self.shown = 0
+        self.dropped = 0  # Captured frames the preview never showed
+        self._after_id = None
+
+        width, height = size
+        self._small = np.empty((height, width, 3), dtype=np.uint8)  # Resized BGR
+        self._rgb = np.empty((height, width, 3), dtype=np.uint8)
+        # PIL view sharing _rgb's memory, so converting into _rgb updates it
+        self._image = Image.frombuffer("RGB", size, self._rgb, "raw", "RGB", 0, 1)
+        self.photo = ImageTk.PhotoImage("RGB", size)
+        self.label.config(image=self.photo)
+        self.label.image = self.photo
+
+    def _scaled_overlay(self, overlay, frame_shape):
+        """The overlay with its boxes mapped from frame to preview pixels."""
+        scale = np.array([self.size[0] / frame_shape[1], self.size[1] / frame_shape[0]] * 2)
+        return overlay._replace(boxes=(overlay.boxes * scale).astype(np.int32),
+                                face_boxes=(overlay.face_boxes * scale).astype(np.int32))
+
+    def tick(self):
+        """Show the newest frame, if there is one, and schedule the next tick."""
+        start = time.perf_counter()
+        last_seq = self.frames.seq
+        ret, frame = self.frames.latest()
+        if ret:
+            if last_seq:
+                self.dropped += self.frames.seq - last_seq - 1
+            cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+            small = self._small
+            overlay = self.overlay_source() if self.overlay_source else None
+            if overlay is not None:
+                small = self.renderer.render(small, self._scaled_overlay(overlay, frame.shape))
+            cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            self.photo.paste(self._image)
+            self.shown += 1
+
+        # Keep the target rate; if this tick ran long, the next one comes sooner
+        elapsed = time.perf_counter() - start
+        self._after_id = self.root.after(max(int((self.interval - elapsed) * 1000), 1), self.tick)
+
+    def start(self):
+        if self._after_id is None:
+            self.tick()
+        return self
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
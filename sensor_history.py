@@ -0,0 +1,254 @@
+import glob
+import os
+import threading
+import time
+import numpy as np
+
+HISTORY_DIR = os.environ.get("DRISHTI_HISTORY_DIR", "sensor_history")  # Spilled per-minute rollups
+RAW_CAPACITY = 36000  # Raw samples kept in memory: 1 h of binary frames, 30 h of text lines
+MINUTE_BUCKETS = 24 * 60  # A day of per-minute rollups
+HOUR_BUCKETS = 30 * 24  # A month of per-hour rollups
+SPILL_DAYS = 31  # Spill files older than this are deleted
+MAX_GAP = 10.0  # Seconds; longer gaps between readings (disconnects) don't count toward durations
+
+# Rollup columns; bad_posture is 1/0 per sample, bad_seconds the time spent in bad posture
+FIELDS = ("roll", "temperature", "distance", "bad_posture", "bad_seconds", "button")
+_COLUMN = {field: i for i, field in enumerate(FIELDS)}
+
+
+class Rollup:
+    """Ring of fixed-width time buckets keeping running prefix sums.
+
+    Window sums, counts and means are two lookups whatever the window
+    length; min/max reduce over at most `buckets` slots.
+    """
+
+    def __init__(self, resolution, buckets, width=len(FIELDS)):
+        self.resolution = resolution
+        self.buckets = buckets
+        self.cum_sum = np.zeros((buckets, width))  # Running totals at the end of each bucket
+        self.cum_count = np.zeros((buckets, width))
+        self.mins = np.full((buckets, width), np.nan)
+        self.maxs = np.full((buckets, width), np.nan)
+        self.total_sum = np.zeros(width)
+        self.total_count = np.zeros(width)
+        self._zeros = np.zeros(width)
+        self.first = None  # Bucket ids
+        self.last = None
+        self.late = 0  # Samples older than the newest bucket, which can't be added
+
+    def bucket(self, timestamp):
+        return int(timestamp // self.resolution)
+
+    def _advance(self, bucket):
+        if self.last is None:
+            self.first = self.last = bucket - 1
+        for b in range(max(self.last + 1, bucket - self.buckets + 1), bucket + 1):
+            slot = b % self.buckets
+            self.cum_sum[slot] = self.total_sum
+            self.cum_count[slot] = self.total_count
+            self.mins[slot] = np.nan
+            self.maxs[slot] = np.nan
+        self.last = bucket
+
+    def add(self, bucket, counts, sums, mins, maxs):
+        """Merge totals into `bucket`; False if it is older than the newest bucket."""
+        if self.last is not None and bucket < self.last:
+            self.late += 1
+            return False
+        if self.last is None or bucket > self.last:
+            self._advance(bucket)
+        slot = bucket % self.buckets
+        self.total_sum += sums
+        self.total_count += counts
+        self.cum_sum[slot] = self.total_sum
+        self.cum_count[slot] = self.total_count
+        np.fmin(self.mins[slot], mins, out=self.mins[slot])
+        np.fmax(self.maxs[slot], maxs, out=self.maxs[slot])
+        return True
+
+    def covers(self, bucket):
+        """Is the running total before `bucket` still in the ring?"""
+        return self.last is None or bucket - 1 <= self.first or self.last - (bucket - 1) < self.buckets
+
+    def _cumulative(self, bucket):
+        """(sums, counts) of everything up to the end of `bucket`."""
+        if self.last is None or bucket <= self.first:
+            return self._zeros, self._zeros
+        if bucket >= self.last:
+            return self.total_sum, self.total_count
+        slot = bucket % self.buckets
+        return self.cum_sum[slot], self.cum_count[slot]
+
+    def totals(self, start, end):
+        """(sums, counts) per field over buckets start..end inclusive."""
+        end_sum, end_count = self._cumulative(end)
+        start_sum, start_count = self._cumulative(start - 1)
+        return end_sum - start_sum, end_count - start_count
+
+    def extremes(self, start, end):
+        """(mins, maxs) per field over buckets start..end inclusive; NaN where empty."""
+        if self.last is not None:
+            start = max(start, self.first + 1, self.last - self.buckets + 1)
+            slots = np.arange(start, min(end, self.last) + 1) % self.buckets
+            if len(slots):
+                return np.fmin.reduce(self.mins[slots], axis=0), np.fmax.reduce(self.maxs[slots], axis=0)
+        return np.full(self.mins.shape[1], np.nan), np.full(self.maxs.shape[1], np.nan)
+
+    def record(self, bucket):
+        """One bucket as a flat row: id, counts, sums, mins, maxs (the spill format)."""
+        sums, counts = self.totals(bucket, bucket)
+        slot = bucket % self.buckets
+        return np.concatenate(([bucket], counts, sums, self.mins[slot], self.maxs[slot]))
+
+
+class SensorHistory:
+    """Sensor time series: a raw sample ring plus per-minute and per-hour rollups.
+
+    add() is called from the serial reader thread; the queries can be called
+    from any thread and cost the same however many samples were recorded.
+    Windows are rounded out to whole minutes (within a day) or hours.
+    Completed minutes are appended to HISTORY_DIR and reloaded on start.
+    """
+
+    def __init__(self, directory=HISTORY_DIR, raw_capacity=RAW_CAPACITY, spill=True):
+        self.directory = directory if spill else None
+        self.raw = np.full((raw_capacity, 1 + len(FIELDS)), np.nan)  # timestamp + FIELDS
+        self.size = 0
+        self.head = 0
+        self.minutes = Rollup(60, MINUTE_BUCKETS)
+        self.hours = Rollup(3600, HOUR_BUCKETS)
+        self._last = None  # (timestamp, posture was bad)
+        self._lock = threading.Lock()
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._load_spill()
+        self._spilled = self.minutes.last  # Newest minute already on disk
+
+    def _row(self, reading):
+        bad = None if reading.posture is None else reading.posture == "Bad"
+        bad_seconds = 0.0
+        if self._last is not None:
+            last_time, last_bad = self._last
+            if last_bad:
+                bad_seconds = min(max(reading.timestamp - last_time, 0.0), MAX_GAP)
+            if bad is None:
+                bad = last_bad  # Button-only readings keep the last posture for duration tracking
+        self._last = (reading.timestamp, bad)
+
+        def number(value):
+            return np.nan if value is None else float(value)
+
+        return np.array([reading.timestamp, number(reading.roll), number(reading.temperature),
+                         number(reading.distance), number(None if reading.posture is None else bad),
+                         bad_seconds, number(reading.button)])
+
+    def add(self, reading):
+        with self._lock:
+            row = self._row(reading)
+            self.raw[self.head] = row
+            self.head = (self.head + 1) % len(self.raw)
+            self.size = min(self.size + 1, len(self.raw))
+
+            values = row[1:]
+            present = ~np.isnan(values)
+            counts = present.astype(float)
+            sums = np.where(present, values, 0.0)
+            minute = self.minutes.bucket(reading.timestamp)
+            previous = self.minutes.last
+            if self.minutes.add(minute, counts, sums, values, values):
+                if self.directory and previous is not None and minute > previous != self._spilled:
+                    self._spill(self.minutes.record(previous))
+                    self._spilled = previous
+                self.hours.add(self.hours.bucket(reading.timestamp), counts, sums, values, values)
+
+    def _spill_path(self, bucket):
+        return os.path.join(self.directory, time.strftime("minutes_%Y%m%d.bin", time.localtime(bucket * 60)))
+
+    def _spill(self, record):
+        try:
+            with open(self._spill_path(int(record[0])), "ab") as f:
+                record.tofile(f)
+        except OSError as e:
+            print(f"[ERROR] Sensor history spill failed: {e}")
+
+    def _load_spill(self):
+        """Rebuild the rollups from spilled minutes, dropping files past SPILL_DAYS."""
+        width = len(FIELDS)
+        cutoff = time.time() - SPILL_DAYS * 86400
+        for path in sorted(glob.glob(os.path.join(self.directory, "minutes_*.bin"))):
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                continue
+            records = np.fromfile(path)
+            for record in records[:len(records) // (1 + 4 * width) * (1 + 4 * width)].reshape(-1, 1 + 4 * width):
+                minute = int(record[0])
+                counts, sums, mins, maxs = record[1:].reshape(4, width)
+                if self.minutes.add(minute, counts, sums, mins, maxs):
+                    self.hours.add(minute // 60, counts, sums, mins, maxs)
+
+    def _window(self, seconds, now):
+        """Rollup and bucket range covering the last `seconds` before `now`."""
+        now = time.time() if now is None else now
+        for rollup in (self.minutes, self.hours):
+            start = rollup.bucket(now - seconds)
+            if rollup.covers(start):
+                return rollup, start, rollup.bucket(now)
+        return self.hours, self.hours.bucket(now) - self.hours.buckets + 2, self.hours.bucket(now)
+
+    def _totals(self, field, seconds, now):
+        column = _COLUMN[field]
+        with self._lock:
+            rollup, start, end = self._window(seconds, now)
+            sums, counts = rollup.totals(start, end)
+            return float(sums[column]), float(counts[column])
+
+    def mean(self, field, seconds, now=None):
+        """Mean of `field` over the last `seconds`, or None without samples."""
+        total, count = self._totals(field, seconds, now)
+        return total / count if count else None
+
+    def count(self, field, seconds, now=None):
+        return int(self._totals(field, seconds, now)[1])
+
+    def total(self, field, seconds, now=None):
+        return self._totals(field, seconds, now)[0]
+
+    def extremes(self, field, seconds, now=None):
+        """(min, max) of `field` over the last `seconds`, or (None, None).
+
+        >>> from sensor_state import SensorReading
+        >>> history = SensorHistory(spill=False)
+        >>> for t in range(0, 600, 60):
+        ...     history.add(SensorReading(-150.0, 33.0 + t / 600, "Good", 40.0, False, 1e9 + t))
+        >>> history.extremes("temperature", 600, now=1e9 + 600)
+        (33.0, 33.9)
+        >>> history.extremes("temperature", 600, now=1e9 + 7800)  # No samples in the window
+        (None, None)
+        """
+        column = _COLUMN[field]
+        with self._lock:
+            rollup, start, end = self._window(seconds, now)
+            mins, maxs = rollup.extremes(start, end)
+        low, high = mins[column], maxs[column]
+        return (None, None) if np.isnan(low) else (float(low), float(high))
+
+    def bad_posture_seconds(self, seconds, now=None):
+        return self.total("bad_seconds", seconds, now)
+
+    def samples(self, seconds, now=None):
+        """Raw rows (timestamp + FIELDS) from the last `seconds` still in memory, oldest first."""
+        now = time.time() if now is None else now
+        with self._lock:
+            if self.size < len(self.raw):
+                ordered = self.raw[:self.size].copy()
+            else:
+                ordered = np.concatenate((self.raw[self.head:], self.raw[:self.head]))
+        return ordered[np.searchsorted(ordered[:, 0], now - seconds):]
+
+
+def seconds_today(now=None):
+    """Seconds since local midnight, for "today" queries."""
+    now = time.time() if now is None else now
+    local = time.localtime(now)
+    return local.tm_hour * 3600 + local.tm_min * 60 + local.tm_sec + (now % 1)
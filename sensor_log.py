@@ -0,0 +1,218 @@
+import argparse
+import atexit
+import csv
+import glob
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+SENSOR_SINK = os.environ.get("DRISHTI_SENSOR_SINK", "sqlite")  # "sqlite" database or "csv" daily files
+DEFAULT_PATHS = {"sqlite": "sensor_data.db", "csv": "sensor_logs"}  # Database file for sqlite, directory for csv
+SENSOR_LOG_PATH = os.environ.get("DRISHTI_SENSOR_LOG") or DEFAULT_PATHS.get(SENSOR_SINK)  # For SENSOR_SINK only
+FLUSH_INTERVAL = 5.0  # Seconds a reading may wait before its batch is written
+FLUSH_ROWS = 200  # Rows that trigger a write before the interval is up
+LOG_QUEUE_SIZE = 10000  # Readings waiting to be written before new ones are dropped
+
+COLUMNS = ("timestamp", "roll", "temperature", "posture", "distance", "button")
+HEADER = ["Time", "Roll", "Temp", "Posture", "Distance", "Button"]
+
+
+def _row(reading):
+    button = None if reading.button is None else int(reading.button)
+    return (reading.timestamp, reading.roll, reading.temperature, reading.posture, reading.distance, button)
+
+
+def _float(value):
+    return float(value) if value else None
+
+
+class SqliteSink:
+    """Append-only SQLite table in WAL mode, so exports can read while the app writes."""
+
+    def __init__(self, path=None):
+        self.path = path or default_path("sqlite")
+        self._db = None
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; only the last batch is at risk
+        db.execute("CREATE TABLE IF NOT EXISTS readings (timestamp REAL, roll REAL, temperature REAL, "
+                   "posture TEXT, distance REAL, button INTEGER)")
+        return db
+
+    def write_rows(self, rows):
+        if self._db is None:
+            self._db = self._connect()
+        with self._db:
+            self._db.executemany("INSERT INTO readings VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def rows(self, start=None, end=None):
+        """Readings in time order, optionally within [start, end) unix seconds."""
+        db = self._connect()
+        try:
+            yield from db.execute("SELECT * FROM readings WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp",
+                                  (start or 0, end or float("inf")))
+        finally:
+            db.close()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class CsvSink:
+    """One append-only CSV file per day, sensor_YYYYMMDD.csv in `directory`."""
+
+    def __init__(self, directory=None):
+        self.directory = directory or default_path("csv")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, timestamp):
+        return os.path.join(self.directory, time.strftime("sensor_%Y%m%d.csv", time.localtime(timestamp)))
+
+    def write_rows(self, rows):
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(self._path(row[0]), []).append(row)
+        for path, day_rows in by_day.items():
+            new = not os.path.exists(path)
+            with open(path, "a", newline="") as f:
+                writer = csv.writer(f)
+                if new:
+                    writer.writerow(COLUMNS)
+                writer.writerows(day_rows)
+
+    def rows(self, start=None, end=None):
+        for path in sorted(glob.glob(os.path.join(self.directory, "sensor_*.csv"))):
+            with open(path, newline="") as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                for timestamp, roll, temperature, posture, distance, button in reader:
+                    timestamp = float(timestamp)
+                    if (start is None or timestamp >= start) and (end is None or timestamp < end):
+                        yield (timestamp, _float(roll), _float(temperature), posture or None, _float(distance),
+                               int(button) if button else None)
+
+    def close(self):
+        pass
+
+
+def default_path(kind):
+    """Where a sink of `kind` lives unless told otherwise; DRISHTI_SENSOR_LOG applies to SENSOR_SINK only."""
+    return SENSOR_LOG_PATH if kind == SENSOR_SINK else DEFAULT_PATHS[kind]
+
+
+def make_sink(kind=SENSOR_SINK, path=None):
+    if kind == "sqlite":
+        return SqliteSink(path)
+    if kind == "csv":
+        return CsvSink(path)
+    raise ValueError(f"Unknown sensor sink: {kind} (expected sqlite or csv)")
+
+
+class SensorLog:
+    """Batches sensor readings into a sink on a background thread.
+
+    write() never blocks or touches the disk: readings are queued and written
+    in one transaction once FLUSH_ROWS have piled up or the oldest has waited
+    FLUSH_INTERVAL seconds. If the writer falls behind, readings are dropped
+    (counted in `dropped`) rather than stalling the serial reader. The last
+    batch is written at interpreter exit.
+    """
+
+    def __init__(self, sink=None, flush_interval=FLUSH_INTERVAL, flush_rows=FLUSH_ROWS, queue_size=LOG_QUEUE_SIZE):
+        self.sink = sink or make_sink()
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self.running = True
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def write(self, reading):
+        try:
+            self._queue.put_nowait(_row(reading))
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        batch = []
+        deadline = None
+        stopping = False
+        while not stopping:
+            try:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                row = self._queue.get(timeout=timeout)
+                if row is None:
+                    stopping = True
+                else:
+                    batch.append(row)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+            if batch and (stopping or len(batch) >= self.flush_rows or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch, deadline = [], None
+        self.sink.close()
+
+    def _flush(self, batch):
+        try:
+            self.sink.write_rows(batch)
+            self.written += len(batch)
+            self.batches += 1
+        except (OSError, sqlite3.Error) as e:
+            self.dropped += len(batch)
+            print(f"[ERROR] Sensor log write failed: {e}")
+
+    def stop(self, timeout=5.0):
+        """Write out what is queued and stop the writer."""
+        if not self.running:
+            return
+        self.running = False
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            print("[ERROR] Sensor log writer is stuck; queued readings are lost.")
+            return
+        self._thread.join(timeout)
+
+
+def export_xlsx(output, sink=None, start=None, end=None):
+    """Stream logged readings into an .xlsx file (openpyxl write-only mode); returns the row count."""
+    import openpyxl
+
+    sink = sink or make_sink()
+    wb = openpyxl.Workbook(write_only=True)
+    sheet = wb.create_sheet("Sensor Data")
+    sheet.append(HEADER)
+    count = 0
+    for timestamp, roll, temperature, posture, distance, button in sink.rows(start, end):
+        moment = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+        button = None if button is None else ("Yes" if int(button) else "No")
+        sheet.append([moment, roll, temperature, posture, distance, button])
+        count += 1
+    wb.save(output)
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sensor log tools.")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("output", nargs="?", default="sensor_data.xlsx")
+    parser.add_argument("--sink", default=SENSOR_SINK, choices=["sqlite", "csv"])
+    parser.add_argument("--path", default=None, help="Database file or CSV directory (default: the sink's usual one)")
+    parser.add_argument("--hours", type=float, default=None, help="Only the last N hours")
+    args = parser.parse_intermixed_args()  # Options may come before or after the output file
+
+    start = time.time() - args.hours * 3600 if args.hours else None
+    rows = export_xlsx(args.output, make_sink(args.sink, args.path), start)
+    print(f"Exported {rows} readings to {args.output}")
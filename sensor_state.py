@@ -0,0 +1,30 @@
+import time
+from collections import namedtuple
+
+# One parsed line from the Arduino; missing fields are None
+SensorReading = namedtuple("SensorReading", ["roll", "temperature", "posture", "distance", "button", "timestamp"])
+
+
+class SensorState:
+    """Latest SensorReading, shared between threads without locks.
+
+    Readings are immutable and publish() swaps a single reference, which is
+    atomic in CPython, so readers always see one whole reading.
+    """
+
+    def __init__(self):
+        self._latest = None
+        self.updates = 0
+
+    def publish(self, reading):
+        self._latest = reading
+        self.updates += 1
+
+    @property
+    def latest(self):
+        return self._latest
+
+    def age(self):
+        """Seconds since the latest reading (None if there is none)."""
+        reading = self._latest
+        return None if reading is None else time.time() - reading.timestamp
@@ -0,0 +1,297 @@
+import os
+import struct
+import threading
+import time
+import serial
+from sensor_state import SensorReading
+
+# Device, pty (see virtual_arduino.py) or pyserial URL such as socket://localhost:7777
+SERIAL_PORT = os.environ.get("DRISHTI_SERIAL_PORT", "COM5")
+BAUD_RATE = int(os.environ.get("DRISHTI_SERIAL_BAUD", "9600"))
+SERIAL_PROTOCOL = os.environ.get("DRISHTI_SERIAL_PROTOCOL", "text")  # Must match BINARY_FRAMES in arduino.cpp
+READ_TIMEOUT = 0.1  # Seconds a read waits for the first byte
+RESET_DELAY = 2  # Seconds the Arduino needs after the port opens (it resets)
+UI_INTERVAL = 0.25  # Seconds between state updates pushed to the UI
+MAX_LINE = 1024  # Longer runs without a newline are line noise and get dropped
+
+# Arduino field names -> SensorReading fields
+FIELDS = {"roll": "roll", "temp": "temperature", "posture": "posture", "distance": "distance",
+          "button": "button", "button pressed": "button"}
+NUMERIC_FIELDS = ("roll", "temperature", "distance")
+
+# Binary frame (arduino.cpp with BINARY_FRAMES 1), little-endian:
+# sync, seq, roll (0.01°), temperature (0.01°C), distance (cm), flags, CRC-8 of seq..flags
+FRAME_SYNC = 0xA5
+FRAME_BODY = struct.Struct("<BhhHB")
+FRAME_SIZE = 1 + FRAME_BODY.size + 1
+FLAG_BAD_POSTURE = 0x01
+FLAG_BUTTON = 0x02
+FLAG_BUTTON_ONLY = 0x04  # Data sending is off; only the button bit is meaningful
+
+
+def _crc8_table(poly=0x07):
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return table
+
+
+CRC8_TABLE = _crc8_table()
+
+
+def crc8(data, start=0, end=None):
+    """CRC-8 (polynomial 0x07) of data[start:end], without copying it.
+
+    >>> hex(crc8(b"123456789"))
+    '0xf4'
+    """
+    crc = 0
+    for i in range(start, len(data) if end is None else end):
+        crc = CRC8_TABLE[crc ^ data[i]]
+    return crc
+
+
+def encode_frame(reading, seq=0):
+    """Pack a reading the way the sketch does; used by tests and the virtual Arduino."""
+    flags = (FLAG_BAD_POSTURE if reading.posture == "Bad" else 0) | (FLAG_BUTTON if reading.button else 0)
+    if reading.roll is None:
+        flags |= FLAG_BUTTON_ONLY
+        body = FRAME_BODY.pack(seq & 0xFF, 0, 0, 0, flags)
+    else:
+        body = FRAME_BODY.pack(seq & 0xFF, round(reading.roll * 100), round(reading.temperature * 100),
+                               min(max(int(reading.distance), 0), 0xFFFF), flags)
+    return bytes([FRAME_SYNC]) + body + bytes([crc8(body)])
+
+
+def _number(text):
+    """Leading number of a field such as "12.50°", "36.2°C" or "45cm"."""
+    end = 0
+    while end < len(text) and (text[end].isdigit() or text[end] in "+-."):
+        end += 1
+    return float(text[:end])
+
+
+def parse_line(line, timestamp=None):
+    """Parse one Arduino text line by field name; None if it has no known fields.
+
+    >>> parse_line("Roll: -150.25°, Temp: 36.53°C, , Posture: Good, Distance: 42cm, Button: No", 0)
+    SensorReading(roll=-150.25, temperature=36.53, posture='Good', distance=42.0, button=False, timestamp=0)
+    >>> parse_line("Button Pressed: Yes", 0)
+    SensorReading(roll=None, temperature=None, posture=None, distance=None, button=True, timestamp=0)
+    >>> parse_line("Mode: Button Only") is None
+    True
+    """
+    values = {}
+    for part in line.split(","):
+        key, sep, value = part.partition(":")
+        field = FIELDS.get(key.strip().lower())
+        if not sep or field is None:
+            continue
+        value = value.strip()
+        try:
+            if field in NUMERIC_FIELDS:
+                values[field] = _number(value)
+            elif field == "button":
+                values[field] = value.lower() == "yes"
+            else:
+                values[field] = value
+        except ValueError:
+            continue
+    if not values:
+        return None
+    return SensorReading(values.get("roll"), values.get("temperature"), values.get("posture"),
+                         values.get("distance"), values.get("button"),
+                         time.time() if timestamp is None else timestamp)
+
+
+class LineDecoder:
+    """Splits the text protocol into lines incrementally and parses each one."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.errors = 0  # Lines with no known fields, and overlong runs of noise
+
+    def feed(self, data, timestamp=None):
+        """Readings completed by `data`; a partial last line waits for the next call."""
+        buffer = self.buffer
+        buffer += data
+        readings = []
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            reading = parse_line(buffer[start:end].decode("utf-8", errors="replace").strip(), timestamp)
+            start = end + 1
+            if reading is None:
+                self.errors += 1
+            else:
+                readings.append(reading)
+        del buffer[:start]
+        if len(buffer) > MAX_LINE:
+            self.errors += 1
+            buffer.clear()
+        return readings
+
+
+class FrameDecoder:
+    """Decodes binary frames in place, resyncing on the next sync byte after corruption.
+
+    >>> from sensor_state import SensorReading
+    >>> reading = SensorReading(-150.25, 36.53, "Good", 42.0, False, 0)
+    >>> first, second = encode_frame(reading, seq=7), encode_frame(reading, seq=8)
+    >>> decoder = FrameDecoder()
+    >>> decoder.feed(b"\\x00garbage" + first[:4], 0)
+    []
+    >>> decoder.feed(first[4:], 0)
+    [SensorReading(roll=-150.25, temperature=36.53, posture='Good', distance=42.0, button=False, timestamp=0)]
+    >>> len(decoder.feed(second[:-1] + b"\\x00" + second, 0))  # Corrupt copy skipped, good one decoded
+    1
+    >>> decoder.errors, decoder.lost
+    (1, 0)
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.errors = 0  # Frames failing the CRC
+        self.skipped = 0  # Bytes thrown away while looking for a sync byte
+        self.lost = 0  # Frames missing according to the sequence numbers
+        self._seq = None
+
+    def feed(self, data, timestamp=None):
+        """Readings completed by `data`; a partial last frame waits for the next call."""
+        buffer = self.buffer
+        buffer += data
+        readings = []
+        pos = 0
+        while len(buffer) - pos >= FRAME_SIZE:
+            if buffer[pos] != FRAME_SYNC:
+                sync = buffer.find(FRAME_SYNC, pos + 1)
+                end = len(buffer) if sync < 0 else sync
+                self.skipped += end - pos
+                pos = end
+                continue
+            if crc8(buffer, pos + 1, pos + FRAME_SIZE - 1) != buffer[pos + FRAME_SIZE - 1]:
+                self.errors += 1
+                self.skipped += 1
+                pos += 1  # Not a frame start after all; look for the next sync byte
+                continue
+            readings.append(self._reading(buffer, pos + 1, timestamp))
+            pos += FRAME_SIZE
+        del buffer[:pos]
+        return readings
+
+    def _reading(self, buffer, offset, timestamp):
+        seq, roll, temperature, distance, flags = FRAME_BODY.unpack_from(buffer, offset)
+        if self._seq is not None:
+            self.lost += (seq - self._seq - 1) & 0xFF
+        self._seq = seq
+        timestamp = time.time() if timestamp is None else timestamp
+        if flags & FLAG_BUTTON_ONLY:
+            return SensorReading(None, None, None, None, bool(flags & FLAG_BUTTON), timestamp)
+        return SensorReading(roll / 100, temperature / 100, "Bad" if flags & FLAG_BAD_POSTURE else "Good",
+                             float(distance), bool(flags & FLAG_BUTTON), timestamp)
+
+
+def make_decoder(protocol=SERIAL_PROTOCOL):
+    if protocol == "text":
+        return LineDecoder()
+    if protocol == "binary":
+        return FrameDecoder()
+    raise ValueError(f"Unknown serial protocol: {protocol} (expected text or binary)")
+
+
+class SerialReader:
+    """Background thread that drains the serial port and decodes every reading.
+
+    Each parsed reading is passed to `on_reading` as decoded, so logs,
+    history and alert rules see missing fields (None) rather than stale
+    ones. `state` and the UI get it merged with the previous reading, so
+    partial lines like "Button Pressed: Yes" in the Arduino's button-only
+    mode keep showing the other fields. `on_update` gets only the newest
+    reading, at most every `ui_interval` seconds, so a fast Arduino can't
+    flood the UI.
+    `on_status` hears "connected", "unavailable" and "lost".
+    """
+
+    def __init__(self, port=SERIAL_PORT, baud_rate=BAUD_RATE, state=None, on_reading=None, on_update=None,
+                 on_status=None, ui_interval=UI_INTERVAL, protocol=SERIAL_PROTOCOL, reset_delay=RESET_DELAY):
+        self.port = port
+        self.baud_rate = baud_rate
+        self.reset_delay = reset_delay
+        self.decoder = make_decoder(protocol)
+        self.state = state
+        self.on_reading = on_reading
+        self.on_update = on_update
+        self.on_status = on_status
+        self.ui_interval = ui_interval
+        self.readings = 0
+        self.bytes = 0
+        self.latest = None
+        self.running = False
+        self._thread = None
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _status(self, status):
+        if self.on_status:
+            self.on_status(status)
+
+    def _run(self):
+        try:
+            port = serial.serial_for_url(self.port, self.baud_rate, timeout=READ_TIMEOUT)
+            time.sleep(self.reset_delay)  # Give time for Arduino to initialize
+        except serial.SerialException:
+            self.running = False
+            self._status("unavailable")
+            return
+
+        self._status("connected")
+        latest = None  # Newest reading not yet pushed to the UI
+        last_update = 0.0
+        try:
+            while self.running:
+                # Everything waiting in one read; blocks at most READ_TIMEOUT when idle
+                data = port.read(port.in_waiting or 1)
+                self.bytes += len(data)
+                for reading in self.decoder.feed(data):
+                    latest = self._publish(reading)
+
+                now = time.monotonic()
+                if latest is not None and self.on_update and now - last_update >= self.ui_interval:
+                    self.on_update(latest)
+                    latest, last_update = None, now
+        except serial.SerialException:
+            self._status("lost")
+        finally:
+            self.running = False
+            port.close()
+
+    @property
+    def errors(self):
+        return self.decoder.errors
+
+    def _publish(self, reading):
+        """Hand the raw reading to on_reading; returns it merged with the previous one for display."""
+        self.readings += 1
+        merged = reading
+        if self.latest is not None and None in reading:
+            merged = SensorReading(*(new if new is not None else old for new, old in zip(reading, self.latest)))
+        self.latest = merged
+        if self.state is not None:
+            self.state.publish(merged)
+        if self.on_reading:
+            self.on_reading(reading)
+        return merged
+
+    def stop(self):
+        self.running = False
+        if self._thread:
+            self._thread.join(timeout=1)
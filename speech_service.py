@@ -1,5 +1,7 @@
 import speech_recognition as sr
 import threading
+from wake_word import WakeWordSpotter, SAMPLE_RATE, WAKE_WORD
+from audio_capture import get_capture
 
 class SpeechService:
     def __init__(self, on_wake_word_detected):
@@ -8,46 +10,50 @@ class SpeechService:
         self.speech_recognizer.dynamic_energy_threshold = True  # Auto-adjusts based on noise
         self.on_wake_word_detected = on_wake_word_detected
         self.is_listening_for_command = False  # Prevents duplicate wake word activations
+        self.capture = get_capture()  # Shared, always-open microphone
 
         # Start listening for wake word in the background
         threading.Thread(target=self.listen_for_wake_word, daemon=True).start()
 
     def listen_for_wake_word(self):
-        """Continuously listens for 'Hello' to activate commands."""
+        """Continuously listens for 'Hello' to activate commands, spotting it on-device."""
+        spotter = WakeWordSpotter(fallback=self.recognize_wake_word)
+        audio = self.capture.subscribe()
+        print("Listening for wake word (Hello)...")
         while True:
-            try:
-                with sr.Microphone() as source:
-                    print("Listening for wake word (Hello)...")
-                    self.speech_recognizer.adjust_for_ambient_noise(source, duration=1)
-                    audio = self.speech_recognizer.listen(source)
-
-                    # Convert speech to text
-                    text = self.speech_recognizer.recognize_google(audio).lower().strip()
-                    print(f"Heard: {text}")
-
-                    # Activate only if wake word detected
-                    if "hello" in text and not self.is_listening_for_command:
-                        self.is_listening_for_command = True  # Prevents multiple activations
-                        print("Wake word detected!")
-                        self.on_wake_word_detected()
-                        self.listen_for_command()  # Now listen for the actual command
-
-            except sr.UnknownValueError:
-                continue  # Ignore and keep listening
-            except sr.RequestError:
-                print("Speech recognition service error.")
-                break  # Stop if there's an API issue
-
-    def listen_for_command(self):
-        """Listens for a user command after activation."""
+            chunk = audio.read()
+            if chunk is None:
+                if not self.capture.running:
+                    print("Speech recognition stopped: no microphone.")
+                    break
+                continue
+
+            # Only an energy gate and MFCC matching run per chunk; nothing leaves the device
+            if spotter.feed(chunk) and not self.is_listening_for_command:
+                self.is_listening_for_command = True  # Prevents multiple activations
+                print("Wake word detected!")
+                self.on_wake_word_detected()
+                self.listen_for_command(audio.position)  # From right after the wake word, even if we were slow
+
+    def recognize_wake_word(self, samples):
+        """Cloud check of one short utterance, used only until wake word templates are enrolled."""
+        try:
+            text = self.speech_recognizer.recognize_google(sr.AudioData(samples.tobytes(), SAMPLE_RATE, 2))
+        except (sr.UnknownValueError, sr.RequestError):
+            return False
+        print(f"Heard: {text}")
+        return WAKE_WORD in text.lower()
+
+    def listen_for_command(self, start=None):
+        """Listens for a user command after activation, from sample `start` of the capture if given."""
         try:
-            with sr.Microphone() as source:
-                print("Listening for command...")
-                self.speech_recognizer.adjust_for_ambient_noise(source, duration=1)
-                audio = self.speech_recognizer.listen(source)
+            print("Listening for command...")
+            audio = self.capture.listen(start)
+            if audio is None:
+                raise sr.UnknownValueError()
 
-                command = self.speech_recognizer.recognize_google(audio).lower().strip()
-                print(f"Command recognized: {command}")
+            command = self.speech_recognizer.recognize_google(audio).lower().strip()
+            print(f"Command recognized: {command}")
 
         except sr.UnknownValueError:
             print("Could not understand. Try again.")
@@ -0,0 +1,89 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+# COCO classes likely to carry readable text
+TEXT_BEARING_CLASSES = {"stop sign", "book", "cell phone", "laptop", "tv", "clock", "parking meter", "bottle"}
+OCR_CACHE_SIZE = 64  # Crops whose text is remembered
+CROP_PADDING = 0.1  # Fraction of the box size added around each crop
+MIN_TEXT_CONFIDENCE = 0.4  # EasyOCR confidence below which a word is dropped
+HASH_SIZE = (33, 16)  # Difference-hash thumbnail (width + 1, height); text crops are wide
+
+
+def crop_hash(crop):
+    """Difference hash of a crop, stable under sensor noise between frames."""
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    small = cv2.resize(gray, HASH_SIZE, interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return hashlib.blake2b(np.packbits(bits).tobytes(), digest_size=16).hexdigest()
+
+
+def pad_box(box, frame_shape, padding=CROP_PADDING):
+    """Grow an x1, y1, x2, y2 box by `padding` and clip it to the frame."""
+    x1, y1, x2, y2 = box
+    pad_x, pad_y = (x2 - x1) * padding, (y2 - y1) * padding
+    height, width = frame_shape[:2]
+    return (max(int(x1 - pad_x), 0), max(int(y1 - pad_y), 0),
+            min(int(x2 + pad_x), width), min(int(y2 + pad_y), height))
+
+
+class TextReader:
+    """On-demand OCR over small crops; the reader loads on first use and results are LRU-cached."""
+
+    def __init__(self, load_reader, cache_size=OCR_CACHE_SIZE):
+        self._load_reader = load_reader  # e.g. ModelRegistry().load_easyocr
+        self._reader = None
+        self._cache = OrderedDict()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def reader(self):
+        """The OCR reader, built the first time text is requested."""
+        with self._lock:
+            if self._reader is None:
+                print("Loading OCR reader...")
+                self._reader = self._load_reader()
+            return self._reader
+
+    def read_crop(self, crop):
+        """Text in one crop, served from the cache when the same crop was read before."""
+        if crop.size == 0:
+            return ""
+        key = crop_hash(crop)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+
+        words = [text for _, text, confidence in self.reader.readtext(crop) if confidence >= MIN_TEXT_CONFIDENCE]
+        text = " ".join(words)
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = text
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return text
+
+    def read_region(self, frame, region):
+        """Text inside a user-requested x1, y1, x2, y2 region."""
+        x1, y1, x2, y2 = pad_box(region, frame.shape, padding=0)
+        return self.read_crop(frame[y1:y2, x1:x2])
+
+    def read_objects(self, frame, boxes, labels):
+        """(label, text) for each detected text-bearing object that has readable text."""
+        results = []
+        for box, label in zip(boxes, labels):
+            if label not in TEXT_BEARING_CLASSES:
+                continue
+            x1, y1, x2, y2 = pad_box(box, frame.shape)
+            text = self.read_crop(frame[y1:y2, x1:x2])
+            if text:
+                results.append((label, text))
+        return results
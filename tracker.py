@@ -0,0 +1,135 @@
+import itertools
+import time
+import numpy as np
+
+SMOOTHING_WINDOW_SIZE = 10  # Distance samples averaged per track
+IOU_THRESHOLD = 0.3  # Minimum overlap for a detection to continue a track
+MAX_TRACK_AGE = 2.0  # Seconds a track survives without a matching detection
+VELOCITY_GAIN = 0.5  # Weight of the newest measurement in the velocity estimate
+APPROACH_SPEED_GAIN = 0.5  # Weight of the newest measurement in the approach speed
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """Pairwise IoU between two (N, 4) and (M, 4) arrays of x1, y1, x2, y2 boxes."""
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.nan_to_num(inter / (area_a + area_b - inter))
+
+
+class Track:
+    """One tracked object with its own ring-buffer distance smoothing."""
+
+    def __init__(self, track_id, box, class_id, now, window=SMOOTHING_WINDOW_SIZE):
+        self.track_id = track_id
+        self.class_id = class_id
+        self.box = np.asarray(box, dtype=np.float32)
+        self.velocity = np.zeros(4, dtype=np.float32)  # Box corner motion in px/s
+        self.last_seen = now
+        self.hits = 0
+
+        self._window = np.zeros(window)
+        self._next = 0
+        self._count = 0
+        self._sum = 0.0
+        self._last_smoothed = None
+        self._last_smoothed_time = now
+        self.approach_speed = 0.0  # cm/s, positive while the object gets closer
+
+    @property
+    def distance(self):
+        """Moving average of this track's distances, or None if it has none."""
+        return self._sum / self._count if self._count else None
+
+    def add_distance(self, distance, now):
+        """Push a distance into the ring buffer in O(1) and update the approach speed."""
+        if self._count == len(self._window):
+            self._sum -= self._window[self._next]
+        else:
+            self._count += 1
+        self._window[self._next] = distance
+        self._sum += distance
+        self._next = (self._next + 1) % len(self._window)
+
+        smoothed = self.distance
+        dt = now - self._last_smoothed_time
+        if self._last_smoothed is not None and dt > 0:
+            speed = (self._last_smoothed - smoothed) / dt
+            self.approach_speed += APPROACH_SPEED_GAIN * (speed - self.approach_speed)
+        self._last_smoothed = smoothed
+        self._last_smoothed_time = now
+
+    def predict(self, now):
+        """Box position extrapolated with the constant-velocity model."""
+        return self.box + self.velocity * (now - self.last_seen)
+
+    def update(self, box, now, predict_motion=True):
+        box = np.asarray(box, dtype=np.float32)
+        dt = now - self.last_seen
+        if predict_motion and self.hits and dt > 0:
+            # Alpha-beta filter: blend the measured corner velocity into the estimate.
+            self.velocity += VELOCITY_GAIN * ((box - self.box) / dt - self.velocity)
+        self.box = box
+        self.last_seen = now
+        self.hits += 1
+
+
+class IoUTracker:
+    """Associates detections across frames by IoU so each object keeps a stable track id."""
+
+    def __init__(self, iou_threshold=IOU_THRESHOLD, max_age=MAX_TRACK_AGE,
+                 window=SMOOTHING_WINDOW_SIZE, predict_motion=True):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.window = window
+        self.predict_motion = predict_motion
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+    def predicted_boxes(self, now=None):
+        """(N, 4) boxes of every live track at time `now`, for frames between inferences."""
+        now = time.monotonic() if now is None else now
+        if not self.tracks:
+            return np.empty((0, 4), dtype=np.float32)
+        if not self.predict_motion:
+            return np.stack([track.box for track in self.tracks])
+        return np.stack([track.predict(now) for track in self.tracks])
+
+    def update(self, boxes, class_ids, distances=None, now=None):
+        """Match detections to tracks and return the Track for each detection, in order."""
+        now = time.monotonic() if now is None else now
+        self.tracks = [track for track in self.tracks if now - track.last_seen <= self.max_age]
+
+        assigned = [None] * len(boxes)
+        if self.tracks and len(boxes):
+            overlaps = iou_matrix(self.predicted_boxes(now), np.asarray(boxes, dtype=np.float32))
+            track_classes = np.array([track.class_id for track in self.tracks])
+            overlaps[track_classes[:, None] != np.asarray(class_ids)[None, :]] = 0
+
+            # Greedy assignment, best overlap first
+            taken = set()
+            for flat in np.argsort(overlaps, axis=None)[::-1]:
+                track_index, detection_index = np.unravel_index(flat, overlaps.shape)
+                if overlaps[track_index, detection_index] < self.iou_threshold:
+                    break
+                if track_index in taken or assigned[detection_index] is not None:
+                    continue
+                assigned[detection_index] = self.tracks[track_index]
+                taken.add(track_index)
+
+        for index, box in enumerate(boxes):
+            track = assigned[index]
+            if track is None:
+                track = Track(next(self._ids), box, int(class_ids[index]), now, self.window)
+                self.tracks.append(track)
+                assigned[index] = track
+            track.update(box, now, self.predict_motion)
+            if distances is not None and np.isfinite(distances[index]):
+                track.add_distance(float(distances[index]), now)
+
+        return assigned
@@ -1,12 +1,273 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
 import pyttsx3
+from phrase_cache import PhraseCache, PRERENDER_FRAGMENTS, play
+
+# Priorities, most urgent first
+SOS = 0
+OBSTACLE = 1
+NAVIGATION = 2
+INFO = 3
+
+# Seconds a queued message stays worth saying (None = until spoken)
+MAX_AGE = {SOS: None, OBSTACLE: 2.0, NAVIGATION: 30.0, INFO: 10.0}
+SPEECH_RATE = 150
+PLAYBACK_POLL = 0.01  # Seconds between preemption checks while a cached phrase plays
+FAIRNESS_LIMIT = 2  # Messages said ahead of a waiting less urgent one before it gets its turn (SOS excepted)
+
+
+class Utterance:
+    """One queued message; wait() blocks until it was spoken, dropped or superseded."""
+
+    def __init__(self, text, priority, key, max_age, seq):
+        self.text = text
+        self.priority = priority
+        self.key = key
+        self.seq = seq
+        self.deadline = None if max_age is None else time.monotonic() + max_age
+        self.spoken = False
+        self.cancelled = False
+        self._done = threading.Event()
+
+    def expired(self, now=None):
+        return self.deadline is not None and (now or time.monotonic()) > self.deadline
+
+    def finish(self, spoken):
+        self.spoken = spoken
+        self._done.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+
+class SpeechArbiter:
+    """The process's only speech engine: one thread, one priority queue.
+
+    Queued messages with the same key are coalesced (the newest text wins),
+    messages older than their priority's MAX_AGE are dropped unsaid, and a
+    more urgent message stops the current utterance at its next word. A
+    preempted message goes back in the queue unless it has gone stale.
+    So that a stream of obstacle reports can't starve navigation prompts
+    and answers, a less urgent message that has waited through
+    FAIRNESS_LIMIT messages is said next, and only SOS can preempt it.
+
+    With `use_phrase_cache` (and simpleaudio installed) messages are played
+    from pre-rendered fragments instead of being synthesized each time;
+    common phrases and distances are rendered while the engine is idle.
+    """
+
+    def __init__(self, rate=SPEECH_RATE, volume=1.0, use_phrase_cache=True):
+        self.rate = rate
+        self.volume = volume
+        self.use_phrase_cache = use_phrase_cache
+        self.phrases = None
+        self._rendering = False
+        self._prerender = deque(PRERENDER_FRAGMENTS)
+        self._cond = threading.Condition()
+        self._heap = []  # (priority, seq, Utterance)
+        self._queued = {}  # key -> queued Utterance
+        self._seq = itertools.count()
+        self._current = None
+        self._preempt = False
+        self._promoted = False  # The current message was said out of turn (see FAIRNESS_LIMIT)
+        self._passed = 0  # Messages said in a row while a less urgent one was waiting
+        self._engine = None
+        self.spoken = 0
+        self.dropped = 0
+        self.preempted = 0
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def say(self, text, priority=INFO, key=None, max_age=-1, wait=False):
+        """Queue `text`; returns its Utterance (waited on when `wait` is set).
+
+        `key` names what the message is about (default: the text itself), so
+        e.g. a newer obstacle description replaces one still in the queue.
+        """
+        key = key or text
+        with self._cond:
+            current = self._current
+            if current is not None and current.key == key and current.text == text and not self._preempt:
+                utterance = current  # Already being said
+            else:
+                queued = self._queued.get(key)
+                if queued is not None:
+                    queued.cancelled = True
+                    queued.finish(False)
+                    self.dropped += 1
+                utterance = Utterance(text, priority, key, MAX_AGE.get(priority) if max_age == -1 else max_age,
+                                      next(self._seq))
+                self._queued[key] = utterance
+                heapq.heappush(self._heap, (priority, utterance.seq, utterance))
+                if current is not None and priority < current.priority and (priority == SOS or not self._promoted):
+                    self._preempt = True
+                self._cond.notify()
+        if wait:
+            utterance.wait()
+        return utterance
+
+    def _on_word(self, name, location, length):
+        # Runs on the engine thread inside runAndWait(), so stop() is safe here
+        if self._preempt and not self._rendering:
+            self._engine.stop()
+
+    def _render_to_file(self, text, path):
+        """PhraseCache renderer; only ever called on the engine thread."""
+        self._rendering = True
+        try:
+            self._engine.save_to_file(text, path)
+            self._engine.runAndWait()
+        finally:
+            self._rendering = False
+
+    def _speak(self, text):
+        """Play `text` from the phrase cache, or synthesize it, until done or preempted."""
+        audio = self.phrases.audio(text) if self.phrases else None
+        if audio is None:
+            self._engine.say(text)
+            self._engine.runAndWait()
+            return
+        playback = play(audio)
+        while playback.is_playing():
+            if self._preempt:
+                playback.stop()
+                break
+            time.sleep(PLAYBACK_POLL)
+
+    def _pop(self):
+        """Pop the most urgent live message, dropping stale and superseded ones."""
+        while self._heap:
+            _, _, utterance = heapq.heappop(self._heap)
+            if utterance.cancelled:
+                continue
+            if self._queued.get(utterance.key) is utterance:
+                del self._queued[utterance.key]
+            if utterance.expired():
+                utterance.finish(False)
+                self.dropped += 1
+                continue
+            return utterance
+        return None
+
+    def _next(self):
+        """The next message to say: the most urgent, unless a less urgent one is owed its turn."""
+        utterance = self._pop()
+        self._promoted = False
+        if utterance is None:
+            return None
+        waiting = [entry for entry in self._heap if not entry[2].cancelled and not entry[2].expired()
+                   and entry[2].priority > utterance.priority]
+        if not waiting:
+            self._passed = 0
+            return utterance
+        if utterance.priority == SOS or self._passed < FAIRNESS_LIMIT:
+            self._passed += 1
+            return utterance
+
+        # The longest-waiting less urgent message goes first; the urgent one stays queued
+        entry = min(waiting, key=lambda entry: entry[1])
+        self._heap.remove(entry)
+        heapq.heapify(self._heap)
+        self._queued[utterance.key] = utterance
+        heapq.heappush(self._heap, (utterance.priority, utterance.seq, utterance))
+        promoted = entry[2]
+        if self._queued.get(promoted.key) is promoted:
+            del self._queued[promoted.key]
+        self._passed, self._promoted = 0, True
+        return promoted
+
+    def _run(self):
+        try:
+            # pyttsx3 drivers must be created and driven on the same thread
+            self._engine = pyttsx3.init()
+            self._engine.setProperty("rate", self.rate)
+            self._engine.setProperty("volume", self.volume)
+            self._engine.connect("started-word", self._on_word)
+            if self.use_phrase_cache:
+                voice = self._engine.getProperty("voice")
+                self.phrases = PhraseCache(self._render_to_file, voice_key=f"{voice}|{self.rate}|{self.volume}")
+        except Exception as e:
+            print(f"Text-to-Speech Error: {e}")
+            self._engine = None
+        if self.phrases is None or not self.phrases.enabled:
+            self._prerender.clear()
+
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._heap or self._prerender or not self.running)
+                if not self.running:
+                    break
+                utterance = self._next()
+                if utterance is None:
+                    # Idle: render one more common fragment; a new message waits at most one render
+                    fragment = self._prerender.popleft() if self._prerender else None
+                else:
+                    self._current, self._preempt = utterance, False
+
+            if utterance is None:
+                if fragment is not None and self.phrases.enabled:
+                    try:
+                        self.phrases.prerender(fragment)
+                    except Exception as e:
+                        print(f"Text-to-Speech Error: {e}")
+                        self._prerender.clear()
+                continue
+
+            if self._engine is not None:
+                try:
+                    self._speak(utterance.text)
+                except Exception as e:
+                    print(f"Text-to-Speech Error: {e}")
+
+            with self._cond:
+                self._current = None
+                if self._preempt and not utterance.expired() and utterance.key not in self._queued:
+                    self._queued[utterance.key] = utterance
+                    heapq.heappush(self._heap, (utterance.priority, utterance.seq, utterance))
+                    self.preempted += 1
+                else:
+                    utterance.finish(self._engine is not None and not self._preempt)
+                    self.spoken += utterance.spoken
+                self._preempt = False
+
+        with self._cond:
+            for _, _, utterance in self._heap:
+                utterance.finish(False)
+
+    def stop(self):
+        with self._cond:
+            self.running = False
+            self._preempt = True
+            self._cond.notify()
+        self._thread.join(timeout=2)
+
+
+_speech = None
+_speech_lock = threading.Lock()
+
+
+def get_speech():
+    """The process-wide SpeechArbiter, started on first use."""
+    global _speech
+    with _speech_lock:
+        if _speech is None:
+            _speech = SpeechArbiter()
+        return _speech
+
+
+def speak(text, priority=INFO, key=None, wait=False):
+    """Queue `text` on the process-wide speech arbiter."""
+    return get_speech().say(text, priority, key=key, wait=wait)
+
 
 class TextToSpeechService:
     def __init__(self):
-        self.speaker = pyttsx3.init()
-        self.speaker.setProperty("rate", 150)  # Adjust speed
-        self.speaker.setProperty("volume", 1.0)
+        self.speech = get_speech()
 
     def speak(self, text):
         """Speak the given text."""
-        self.speaker.say(text)
-        self.speaker.runAndWait()
+        self.speech.say(text, INFO, wait=True)
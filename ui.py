@@ -1,10 +1,14 @@
+import os
 import tkinter as tk
 from tkinter import ttk
 import threading
-import cv2
-from PIL import Image, ImageTk
 from tts_service import TextToSpeechService
 from hardware_data import HardwareMonitor
+from frame_hub import FrameHub, open_source
+from preview import TkPreview
+
+# Camera index, video file or image directory (e.g. saved_frames/) to read from
+CAMERA_SOURCE = os.environ.get("DRISHTI_CAMERA_SOURCE", "0")
 
 
 class DristhiApp:
@@ -28,11 +32,12 @@ class DristhiApp:
         self.setup_health_tab()
 
         self.object_detection_callback = None
+        self.read_text_callback = None
         self.audio_enabled = True
 
-        # OpenCV Camera Feed
-        self.cap = cv2.VideoCapture(0)
-        self.update_camera_feed()
+        # Shared camera feed: decoded once, read by the preview and every detector
+        self.frame_hub = FrameHub(open_source(CAMERA_SOURCE)).start()
+        self.preview = TkPreview(self.root, self.camera_feed_label, self.frame_hub).start()
 
     def setup_home_tab(self):
         """Setup UI elements for the Home tab."""
@@ -72,6 +77,18 @@ class DristhiApp:
         )
         camera_button.pack(pady=10, fill=tk.X)
 
+        read_text_button = tk.Button(
+            control_frame,
+            text="Read Text",
+            command=self.start_read_text,
+            font=("Arial", 12, "bold"),
+            bg="#6F42C1",
+            fg="white",
+            relief="raised",
+            bd=3
+        )
+        read_text_button.pack(pady=10, fill=tk.X)
+
         self.camera_feed_label = tk.Label(self.home_tab)
         self.camera_feed_label.pack(pady=20)
 
@@ -103,21 +120,28 @@ class DristhiApp:
 
         self.speech_label.config(text=display_text)
 
-    def update_camera_feed(self):
-        """Continuously capture frames from OpenCV and display in Tkinter UI."""
-        ret, frame = self.cap.read()
-        if ret:
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame = cv2.resize(frame, (400, 300))
-            img = ImageTk.PhotoImage(image=Image.fromarray(frame))
-            self.camera_feed_label.config(image=img)
-            self.camera_feed_label.image = img
-
-        self.root.after(500, self.update_camera_feed)
-
     def set_object_detection_callback(self, callback):
         self.object_detection_callback = callback
 
     def start_object_detection(self):
         if self.object_detection_callback:
             self.object_detection_callback()
+
+    def set_overlay_source(self, callback):
+        """Draw the detector's latest Overlay on the preview (only on frames that are shown)."""
+        self.preview.overlay_source = callback
+
+    def set_read_text_callback(self, callback):
+        self.read_text_callback = callback
+
+    def start_read_text(self):
+        """Run OCR off the Tk thread and show what was read."""
+        if not self.read_text_callback:
+            return
+
+        def read():
+            text = self.read_text_callback()
+            if text:
+                self.root.after(0, lambda: self.speech_label.config(text=f"Text: {text}"))
+
+        threading.Thread(target=read, daemon=True).start()
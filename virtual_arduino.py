@@ -0,0 +1,164 @@
+import argparse
+import math
+import os
+import socket
+import threading
+import time
+from sensor_state import SensorReading
+from serial_reader import encode_frame, parse_line, BAUD_RATE
+
+BITS_PER_BYTE = 10  # 8N1: start + 8 data + stop
+
+
+def format_line(reading):
+    """A reading as arduino.cpp prints it in text mode."""
+    if reading.roll is None:
+        return f"Button Pressed: {'Yes' if reading.button else 'No'}\r\n".encode()
+    return (f"Roll: {reading.roll:.2f}°, Temp: {reading.temperature:.2f}°C, , Posture: {reading.posture}, "
+            f"Distance: {int(reading.distance)}cm, Button: {'Yes' if reading.button else 'No'}\r\n").encode()
+
+
+def synthetic_readings(bad_every=200, bad_for=60, press_every=50):
+    """Endless made-up sensor stream with bad posture spells and button presses.
+
+    Distance counts the samples (mod 60000), so a receiver can tell which one it got.
+    """
+    index = 0
+    while True:
+        bad = index % bad_every >= bad_every - bad_for
+        roll = (-60.0 if bad else -150.0) + 5 * math.sin(index / 10)
+        temperature = 33.0 + math.sin(index / 500)
+        yield SensorReading(round(roll, 2), round(temperature, 2), "Bad" if bad else "Good", float(index % 60000),
+                            index % press_every == 0, None)
+        index += 1
+
+
+def recorded_readings(path, loop=True):
+    """Readings from a capture of the text protocol, one line per sample."""
+    while True:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                reading = parse_line(line.strip())
+                if reading is not None:
+                    yield reading
+        if not loop:
+            return
+
+
+class VirtualArduino:
+    """Stands in for the bag's Arduino on a pty (POSIX) or a TCP port.
+
+    Streams `readings` in the text or binary protocol at `rate` samples per
+    second (None = as fast as the link allows), paced like a `baud` serial
+    line (0 = unpaced). Point the app at `port`, e.g. DRISHTI_SERIAL_PORT.
+    With `record`, sent[i] is the perf_counter time sample i was written.
+    """
+
+    def __init__(self, readings=None, protocol="text", rate=None, baud=BAUD_RATE, tcp_port=None, record=False):
+        if protocol not in ("text", "binary"):
+            raise ValueError(f"Unknown serial protocol: {protocol} (expected text or binary)")
+        self.readings = readings if readings is not None else synthetic_readings()
+        self.encode = format_line if protocol == "text" else encode_frame
+        self.protocol = protocol
+        self.rate = rate
+        self.baud = baud
+        self.record = record
+        self.sent = []
+        self.count = 0
+        self.bytes = 0
+        self.running = False
+        self._write = None
+        self._server = None
+        self._fds = ()
+        if tcp_port is not None:
+            self._server = socket.create_server(("localhost", tcp_port))
+            self.port = f"socket://localhost:{tcp_port}"
+        else:
+            import tty  # POSIX only; use tcp_port elsewhere
+
+            master, slave = os.openpty()
+            tty.setraw(slave)  # No newline translation; binary frames must pass unchanged
+            self._fds = (master, slave)
+            self._write = lambda data: os.write(master, data)
+            self.port = os.ttyname(slave)
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def _connect(self):
+        """Wait for the reader to connect to the TCP port."""
+        self._server.settimeout(0.5)
+        while self.running:
+            try:
+                connection, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._write = connection.sendall
+            return True
+        return False
+
+    def _run(self):
+        if self._server is not None and not self._connect():
+            return
+        start = time.perf_counter()
+        line_free = start  # When the emulated serial line finishes the previous write
+        index = 0
+        try:
+            while self.running:
+                now = time.perf_counter()
+                due = index + 1 if self.rate is None else int((now - start) * self.rate) + 1
+                if due <= index or line_free > now:
+                    wake = line_free if self.rate is None else max(start + index / self.rate, line_free)
+                    time.sleep(max(wake - now, 0.0005))
+                    continue
+                # Everything due goes out in one write, as a UART would send it back to back
+                chunk = bytearray()
+                while index < due and (not self.baud or len(chunk) * BITS_PER_BYTE / self.baud < 0.01):
+                    chunk += self.encode(next(self.readings))
+                    index += 1
+                written = time.perf_counter()
+                self._write(bytes(chunk))
+                if self.record:
+                    self.sent.extend([written] * (index - len(self.sent)))
+                self.count, self.bytes = index, self.bytes + len(chunk)
+                if self.baud:
+                    line_free = max(line_free, now) + len(chunk) * BITS_PER_BYTE / self.baud
+        except (OSError, StopIteration):
+            pass
+        finally:
+            self.running = False
+
+    def stop(self):
+        self.running = False
+        time.sleep(0.05)
+        if self._server is not None:
+            self._server.close()
+        for fd in self._fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Virtual Arduino: replays sensor data on a pty or TCP port.")
+    parser.add_argument("--protocol", default="text", choices=["text", "binary"])
+    parser.add_argument("--rate", type=float, default=None, help="Samples per second (default: line speed)")
+    parser.add_argument("--baud", type=int, default=BAUD_RATE, help="Emulated line speed; 0 = unpaced")
+    parser.add_argument("--replay", default=None, help="Text capture to replay instead of synthetic data")
+    parser.add_argument("--tcp", type=int, default=None, help="Serve on socket://localhost:PORT instead of a pty")
+    args = parser.parse_args()
+
+    readings = recorded_readings(args.replay) if args.replay else None
+    device = VirtualArduino(readings, args.protocol, args.rate, args.baud, args.tcp).start()
+    print(f"Virtual Arduino on {device.port}; run the app with DRISHTI_SERIAL_PORT={device.port}"
+          + (" DRISHTI_SERIAL_PROTOCOL=binary" if args.protocol == "binary" else ""))
+    try:
+        while device.running:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    device.stop()
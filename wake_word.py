@@ -0,0 +1,237 @@
+import argparse
+import glob
+import os
+import wave
+import numpy as np
+
+SAMPLE_RATE = 16000
+CHUNK_SAMPLES = 320  # 20 ms per streamed chunk
+WAKE_WORD = "hello"
+TEMPLATE_DIR = os.environ.get("DRISHTI_WAKE_TEMPLATES", "wake_word_templates")  # Recorded WAVs of the wake word
+WAKE_THRESHOLD = float(os.environ.get("DRISHTI_WAKE_THRESHOLD", "0.35"))  # Max DTW distance that counts as a match
+
+# Energy gate
+SPEECH_RATIO = 3.0  # Chunk energy above noise floor * ratio is speech
+NOISE_ADAPT = 0.05  # How fast the noise floor follows quiet chunks
+MIN_NOISE = 1e2  # Floor for the noise estimate (int16 mean square)
+HANGOVER_CHUNKS = 10  # Quiet chunks (200 ms) that end an utterance
+MIN_SPEECH_CHUNKS = 8  # Shorter bursts (clicks, taps) are ignored
+MAX_WAKE_CHUNKS = 75  # Utterances longer than 1.5 s can't be the wake word
+
+# MFCC
+FRAME_LENGTH = 400  # 25 ms
+FRAME_STEP = 160  # 10 ms
+FFT_SIZE = 512
+MEL_BANDS = 26
+MFCC_COUNT = 13
+DTW_BAND = 0.3  # Sakoe-Chiba band as a fraction of the longer sequence
+
+
+def to_samples(chunk):
+    """int16 samples from raw PCM bytes or an array."""
+    if isinstance(chunk, (bytes, bytearray, memoryview)):
+        return np.frombuffer(chunk, dtype=np.int16)
+    return np.asarray(chunk, dtype=np.int16)
+
+
+def read_wav(path):
+    """Mono 16-bit samples and the sample rate of a WAV file."""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path} is not 16-bit PCM")
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        if f.getnchannels() > 1:
+            samples = samples.reshape(-1, f.getnchannels())[:, 0]
+        return samples, f.getframerate()
+
+
+def _mel_filterbank(sample_rate):
+    def hz_to_mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    mels = np.linspace(hz_to_mel(0), hz_to_mel(sample_rate / 2), MEL_BANDS + 2)
+    bins = np.floor((FFT_SIZE + 1) * 700 * (10 ** (mels / 2595) - 1) / sample_rate).astype(int)
+    bank = np.zeros((MEL_BANDS, FFT_SIZE // 2 + 1))
+    for m in range(1, MEL_BANDS + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        bank[m - 1, left:center] = (np.arange(left, center) - left) / max(center - left, 1)
+        bank[m - 1, center:right] = (right - np.arange(center, right)) / max(right - center, 1)
+    return bank
+
+
+_FILTERBANKS = {}
+_DCT = np.cos(np.pi / MEL_BANDS * (np.arange(MEL_BANDS) + 0.5)[None, :] * np.arange(MFCC_COUNT)[:, None])
+_WINDOW = np.hamming(FRAME_LENGTH)
+
+
+def mfcc(samples, sample_rate=SAMPLE_RATE):
+    """(frames, MFCC_COUNT) cepstral-mean-normalized MFCCs."""
+    signal = samples.astype(np.float32) / 32768.0
+    signal = np.append(signal[0], signal[1:] - 0.97 * signal[:-1])  # Pre-emphasis
+    if len(signal) < FRAME_LENGTH:
+        signal = np.pad(signal, (0, FRAME_LENGTH - len(signal)))
+    count = 1 + (len(signal) - FRAME_LENGTH) // FRAME_STEP
+    frames = np.lib.stride_tricks.as_strided(
+        signal, (count, FRAME_LENGTH), (signal.strides[0] * FRAME_STEP, signal.strides[0])) * _WINDOW
+    power = np.abs(np.fft.rfft(frames, FFT_SIZE)) ** 2 / FFT_SIZE
+
+    if sample_rate not in _FILTERBANKS:
+        _FILTERBANKS[sample_rate] = _mel_filterbank(sample_rate)
+    energies = np.log(power @ _FILTERBANKS[sample_rate].T + 1e-10)
+    features = energies @ _DCT.T
+    return features - features.mean(axis=0)
+
+
+def dtw_distance(a, b):
+    """Length-normalized DTW distance between two feature sequences, within a Sakoe-Chiba band."""
+    n, m = len(a), len(b)
+    band = max(int(max(n, m) * DTW_BAND), abs(n - m)) + 1
+    cost = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2)) / np.sqrt(a.shape[1])
+    total = np.full((n + 1, m + 1), np.inf)
+    total[0, 0] = 0.0
+    for i in range(1, n + 1):
+        center = i * m // n
+        for j in range(max(1, center - band), min(m, center + band) + 1):
+            total[i, j] = cost[i - 1, j - 1] + min(total[i - 1, j - 1], total[i - 1, j], total[i, j - 1])
+    return total[n, m] / (n + m)
+
+
+class EnergyVAD:
+    """Energy gate over streamed chunks that tracks the noise floor and cuts out utterances.
+
+    feed() returns the samples of an utterance once it has ended, else None.
+    """
+
+    def __init__(self, speech_ratio=SPEECH_RATIO, hangover=HANGOVER_CHUNKS, min_chunks=MIN_SPEECH_CHUNKS,
+                 max_chunks=None, noise_floor=None):
+        self.speech_ratio = speech_ratio
+        self.hangover = hangover
+        self.min_chunks = min_chunks
+        self.max_chunks = max_chunks  # Longer utterances are discarded
+        self.noise_floor = noise_floor  # None = start from the first chunk
+        self.in_speech = False
+        self._chunks = []
+        self._length = 0
+        self._speech_chunks = 0
+        self._quiet = 0
+
+    def is_speech(self, samples):
+        energy = float(np.mean(samples.astype(np.float32) ** 2)) if len(samples) else 0.0
+        if self.noise_floor is None:
+            self.noise_floor = max(energy, MIN_NOISE)
+        speech = energy > self.noise_floor * self.speech_ratio
+        if not speech:
+            self.noise_floor = max((1 - NOISE_ADAPT) * self.noise_floor + NOISE_ADAPT * energy, MIN_NOISE)
+        return speech
+
+    def feed(self, chunk):
+        samples = to_samples(chunk)
+        speech = self.is_speech(samples)
+        if not self.in_speech:
+            if speech:
+                self.in_speech = True
+                self._chunks, self._length, self._speech_chunks, self._quiet = [samples], 1, 1, 0
+            return None
+
+        self._length += 1
+        if not self.max_chunks or self._length <= self.max_chunks + self.hangover:
+            self._chunks.append(samples)  # Past that it is discarded anyway; stop growing
+        if speech:
+            self._speech_chunks += 1
+            self._quiet = 0
+        else:
+            self._quiet += 1
+        if self._quiet < self.hangover:
+            return None
+
+        self.in_speech = False
+        chunks, self._chunks = self._chunks[:len(self._chunks) - self._quiet], []
+        if self._speech_chunks < self.min_chunks or (self.max_chunks and self._length - self._quiet > self.max_chunks):
+            return None
+        return np.concatenate(chunks)
+
+    def flush(self):
+        """End the current utterance now and return its samples (None if there is none)."""
+        if not self.in_speech:
+            return None
+        self.in_speech = False
+        chunks, self._chunks = self._chunks, []
+        return np.concatenate(chunks)
+
+
+class WakeWordSpotter:
+    """On-device wake word detection: energy gate, then MFCC + DTW against recorded templates.
+
+    Without templates (see `python wake_word.py enroll`) every short
+    utterance is treated as a candidate, and `fallback(samples)` can decide,
+    e.g. by cloud recognition of just that snippet.
+    """
+
+    def __init__(self, template_dir=TEMPLATE_DIR, threshold=WAKE_THRESHOLD, sample_rate=SAMPLE_RATE, fallback=None):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.fallback = fallback
+        self.vad = EnergyVAD(max_chunks=MAX_WAKE_CHUNKS)
+        self.templates = []
+        for path in sorted(glob.glob(os.path.join(template_dir, "*.wav"))):
+            samples, rate = read_wav(path)
+            self.templates.append(mfcc(samples, rate))
+        self.last_distance = None
+        self.candidates = 0
+
+    def score(self, samples):
+        """Smallest DTW distance from an utterance to any template."""
+        features = mfcc(samples, self.sample_rate)
+        return min(dtw_distance(features, template) for template in self.templates)
+
+    def check(self, samples):
+        """Is this complete utterance the wake word?"""
+        self.candidates += 1
+        if not self.templates:
+            return bool(self.fallback and self.fallback(samples))
+        self.last_distance = self.score(samples)
+        return self.last_distance <= self.threshold
+
+    def feed(self, chunk):
+        """Feed one streamed chunk; True when it ended a wake word utterance."""
+        utterance = self.vad.feed(chunk)
+        return utterance is not None and self.check(utterance)
+
+
+def write_wav(path, samples, sample_rate=SAMPLE_RATE):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+
+
+def enroll(count=3, template_dir=TEMPLATE_DIR):
+    """Record `count` examples of the wake word from the microphone as templates."""
+    from audio_capture import get_capture
+
+    os.makedirs(template_dir, exist_ok=True)
+    capture = get_capture()
+    audio = capture.subscribe()
+    vad = EnergyVAD(max_chunks=MAX_WAKE_CHUNKS)
+    for i in range(count):
+        print(f"Say '{WAKE_WORD}' ({i + 1}/{count})...")
+        utterance = None
+        while utterance is None:
+            chunk = audio.read()
+            if chunk is None:
+                if not capture.running:
+                    raise SystemExit("No microphone available.")
+                continue
+            utterance = vad.feed(chunk)
+        path = os.path.join(template_dir, f"{WAKE_WORD}_{i + 1}.wav")
+        write_wav(path, utterance)
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local wake word templates.")
+    parser.add_argument("command", choices=["enroll"])
+    parser.add_argument("--count", type=int, default=3)
+    args = parser.parse_args()
+    enroll(args.count)
@@ -0,0 +1,51 @@
+from collections import namedtuple
+import numpy as np
+
+MIN_CONFIDENCE = 0.25  # Boxes below this YOLO confidence are dropped
+APPROACHING_SPEED = 20.0  # Closing speed (cm/s) announced as "approaching"
+
+# One row per kept box: int32 (x1, y1, x2, y2), float confidences, int class ids, float cm (NaN = unknown)
+Detections = namedtuple("Detections", ["boxes", "confidences", "class_ids", "distances"])
+
+
+def class_name_table(names):
+    """Class names indexed by YOLO class id (model.names may be a list or a dict)."""
+    return np.asarray([names[i] for i in range(len(names))], dtype=object)
+
+
+def build_width_table(class_names, known_widths):
+    """Real-world width in cm per YOLO class id, NaN for classes we can't range."""
+    table = np.full(len(class_names), np.nan, dtype=np.float32)
+    for class_id, name in enumerate(class_names):
+        if name in known_widths:
+            table[class_id] = known_widths[name]
+    return table
+
+
+def postprocess(xyxy, width_table, focal_length, min_confidence=MIN_CONFIDENCE):
+    """Filter YOLO boxes and compute pinhole distances for all of them in one step.
+
+    `xyxy` is YOLOv5's raw (N, 6) per-image output, [x1, y1, x2, y2, conf, cls],
+    as a torch tensor or NumPy array.
+    """
+    if hasattr(xyxy, "cpu"):
+        xyxy = xyxy.cpu().numpy()
+    xyxy = xyxy[xyxy[:, 4] >= min_confidence]
+
+    class_ids = xyxy[:, 5].astype(np.intp)
+    pixel_widths = xyxy[:, 2] - xyxy[:, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distances = np.where(pixel_widths > 0, width_table[class_ids] * focal_length / pixel_widths, np.nan)
+
+    return Detections(xyxy[:, :4].astype(np.int32), xyxy[:, 4], class_ids, distances.astype(np.float32))
+
+
+def describe(labels, distances, approach_speeds=None):
+    """Announcement text like 'person (120.50 cm, approaching), chair (Unknown distance)'."""
+    if approach_speeds is None:
+        approach_speeds = np.zeros(len(labels))
+    return ", ".join(
+        f"{label} ({distance:.2f} cm{', approaching' if speed >= APPROACHING_SPEED else ''})"
+        if np.isfinite(distance) else f"{label} (Unknown distance)"
+        for label, distance, speed in zip(labels, distances, approach_speeds)
+    )